@@ -2,21 +2,2883 @@
 # SDG 8: Decent Work and Economic Growth
 # Real-time Job Search System with AI Recommendations
 
-import pandas as pd
-import numpy as np
-import requests
+import asyncio
+import csv
+import functools
+import gzip
 import json
 from datetime import datetime
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import pickle
+import random
+import hashlib
+import math
+import sqlite3
+import uuid
+import zlib
+import threading
+import time
+import itertools
+import importlib
+from array import array
+from collections import Counter, OrderedDict, deque, namedtuple
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed, wait
 import warnings
 warnings.filterwarnings('ignore')
 
+
+class LazyModule:
+    # Heavy dependencies are imported on first attribute access, so importing
+    # ascend and starting an agent only pays for the paths a worker uses.
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+    
+    def __getattr__(self, attr):
+        if attr in ('name', 'module'):
+            raise AttributeError(attr)
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        return getattr(self.module, attr)
+
+
+np = LazyModule('numpy')
+sparse = LazyModule('scipy.sparse')
+requests = LazyModule('requests')
+sklearn_text = LazyModule('sklearn.feature_extraction.text')
+sklearn_pairwise = LazyModule('sklearn.metrics.pairwise')
+
+
+class NullSpan:
+    # Returned by a disabled Tracer so instrumented code pays for one
+    # attribute check and nothing else.
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+    
+    def set(self, key, value):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(tracer.span_ids)
+        self.parent_id = None
+    
+    def __enter__(self):
+        stack = self.tracer.stack()
+        self.parent_id = stack[-1].span_id if stack else None
+        stack.append(self)
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.started
+        stack = self.tracer.stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.attributes['error'] = f"{exc_type.__name__}: {exc_value}"
+        
+        self.tracer.export({
+            'type': 'span',
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.started_at,
+            'duration_ms': duration * 1000,
+            'thread': threading.current_thread().name,
+            'attributes': self.attributes
+        })
+        return False
+    
+    def set(self, key, value):
+        self.attributes[key] = value
+
+
+class Tracer:
+    # Timing spans and counters for each pipeline stage, sent to pluggable
+    # exporters. With no exporters the tracer is disabled and span() hands
+    # back NULL_SPAN.
+    def __init__(self, exporters=None):
+        self.exporters = list(exporters or [])
+        self.enabled = bool(self.exporters)
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.span_ids = itertools.count(1)
+    
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+        self.enabled = True
+    
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+    
+    def span(self, name, **attributes):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attributes)
+    
+    def count(self, name, value=1, **attributes):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        self.export({'type': 'counter', 'name': name, 'value': value, 'time': time.time(), 'attributes': attributes})
+    
+    def export(self, record):
+        for exporter in self.exporters:
+            try:
+                exporter.export(record)
+            except Exception as e:
+                print(f"Trace exporter {type(exporter).__name__} failed: {e}")
+    
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+
+class JsonLinesExporter:
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8')
+    
+    def export(self, record):
+        line = json.dumps(record, default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+    
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class MemoryExporter:
+    # Keeps every record in memory; meant for tests and the benchmark harness.
+    def __init__(self):
+        self.records = []
+        self.lock = threading.Lock()
+    
+    def export(self, record):
+        with self.lock:
+            self.records.append(record)
+    
+    def spans(self, name=None):
+        return [record for record in self.records if record['type'] == 'span' and (name is None or record['name'] == name)]
+    
+    def counter(self, name):
+        return sum(record['value'] for record in self.records if record['type'] == 'counter' and record['name'] == name)
+    
+    def clear(self):
+        with self.lock:
+            self.records = []
+    
+    def close(self):
+        pass
+
+
+class JobDeduplicator:
+    # MinHash signatures over word shingles of title, company and the start of
+    # the description, bucketed with LSH banding so a near-duplicate lookup
+    # only compares against postings that share at least one band. Employer
+    # boilerplate often opens the description, so title words get extra
+    # weighted shingles and the final score blends in how similar the
+    # normalised titles are. Candidates must be in the same city.
+    VERSION = 3
+    TITLE_ABBREVIATIONS = {'sr': 'senior', 'snr': 'senior', 'jr': 'junior', 'jnr': 'junior', 'mgr': 'manager',
+                           'engg': 'engineer', 'dev': 'developer', 'exec': 'executive', 'asst': 'assistant'}
+    
+    def __init__(self, num_perm=64, bands=16, threshold=0.6, shingle_size=3, description_chars=500,
+                 title_weight=4, title_share=0.3):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        # Adzuna only returns a description snippet, so comparing just the
+        # opening of each description keeps snippets and full texts similar.
+        self.description_chars = description_chars
+        self.title_weight = title_weight
+        # Share of the duplicate score that comes from title-word overlap.
+        self.title_share = title_share
+        
+        self.hash_a = None
+        self.hash_b = None
+        
+        self.buckets = {}
+        self.signatures = {}
+        self.identities = {}
+    
+    @staticmethod
+    def words(text):
+        return re.findall(r'[a-z0-9]+', str(text or '').lower())
+    
+    def title_words(self, title):
+        # "Sr. Python Developer (Django) - Immediate Joiner" -> senior python
+        # developer: providers decorate the same title differently.
+        title = re.sub(r'\([^)]*\)|\[[^\]]*\]', ' ', str(title or ''))
+        title = re.split(r'\s+[-–|]\s+', title)[0]
+        return [self.TITLE_ABBREVIATIONS.get(word, word) for word in self.words(title)]
+    
+    def identity(self, job, city_id=None):
+        # Normalised title words plus the gazetteer city (or the raw location
+        # text when the city is unknown); only same-city postings are merged.
+        city = city_id or " ".join(self.words(job.get('location')))
+        return frozenset(self.title_words(job.get('title'))), city
+    
+    def shingles(self, job):
+        text = f"{job.get('title', '')} {job.get('company', '')} {str(job.get('description', ''))[:self.description_chars]}"
+        words = self.words(text)
+        if len(words) < self.shingle_size:
+            shingles = {" ".join(words)}
+        else:
+            shingles = {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+        
+        title_words = self.title_words(job.get('title'))
+        title_terms = set(title_words) | {" ".join(pair) for pair in zip(title_words, title_words[1:])}
+        for copy in range(self.title_weight):
+            shingles.update(f"title{copy} {term}" for term in title_terms)
+        return shingles
+    
+    def signature(self, job):
+        if self.hash_a is None:
+            rng = np.random.RandomState(8)
+            self.hash_a = rng.randint(1, 2 ** 31 - 1, size=self.num_perm).astype(np.uint64)
+            self.hash_b = rng.randint(0, 2 ** 31 - 1, size=self.num_perm).astype(np.uint64)
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in self.shingles(job)), dtype=np.uint64)
+        permuted = (np.outer(hashes, self.hash_a) + self.hash_b) & np.uint64(0xFFFFFFFF)
+        return permuted.min(axis=0).astype(np.uint32)
+    
+    def band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+    
+    @staticmethod
+    def title_similarity(a, b):
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+    
+    def find(self, signature, identity):
+        candidates = set()
+        for band_key in self.band_keys(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+        
+        title, city = identity
+        best_key = None
+        best_similarity = self.threshold
+        for key in candidates:
+            other_title, other_city = self.identities[key]
+            if other_city != city:
+                continue
+            similarity = ((1 - self.title_share) * float(np.mean(self.signatures[key] == signature))
+                          + self.title_share * self.title_similarity(title, other_title))
+            if similarity >= best_similarity:
+                best_key = key
+                best_similarity = similarity
+        return best_key
+    
+    def add(self, key, signature, identity):
+        self.signatures[key] = signature
+        self.identities[key] = identity
+        for band_key in self.band_keys(signature):
+            self.buckets.setdefault(band_key, []).append(key)
+
+
+City = namedtuple('City', ['id', 'name', 'state', 'lat', 'lon', 'tier'])
+
+
+class Gazetteer:
+    # Offline table of Indian job-market cities: canonical id, coordinates,
+    # market tier and the spellings providers use. Cities are bucketed on a
+    # one-degree lat/lon grid so radius queries only measure distances to
+    # cities in the surrounding cells.
+    CITIES = [
+        # (id, name, state, lat, lon, tier, aliases)
+        ('delhi', 'Delhi', 'Delhi', 28.6139, 77.2090, 1, ['new delhi', 'delhi ncr', 'ncr']),
+        ('mumbai', 'Mumbai', 'Maharashtra', 19.0760, 72.8777, 1, ['bombay', 'greater mumbai']),
+        ('bangalore', 'Bangalore', 'Karnataka', 12.9716, 77.5946, 1, ['bengaluru', 'bangalore urban', 'bengaluru urban']),
+        ('hyderabad', 'Hyderabad', 'Telangana', 17.3850, 78.4867, 1, []),
+        ('chennai', 'Chennai', 'Tamil Nadu', 13.0827, 80.2707, 1, ['madras']),
+        ('kolkata', 'Kolkata', 'West Bengal', 22.5726, 88.3639, 1, ['calcutta']),
+        ('pune', 'Pune', 'Maharashtra', 18.5204, 73.8567, 1, ['poona']),
+        ('ahmedabad', 'Ahmedabad', 'Gujarat', 23.0225, 72.5714, 1, ['amdavad']),
+        ('gurgaon', 'Gurgaon', 'Haryana', 28.4595, 77.0266, 2, ['gurugram']),
+        ('noida', 'Noida', 'Uttar Pradesh', 28.5355, 77.3910, 2, ['greater noida']),
+        ('ghaziabad', 'Ghaziabad', 'Uttar Pradesh', 28.6692, 77.4538, 2, []),
+        ('faridabad', 'Faridabad', 'Haryana', 28.4089, 77.3178, 2, []),
+        ('navi-mumbai', 'Navi Mumbai', 'Maharashtra', 19.0330, 73.0297, 2, ['new bombay']),
+        ('thane', 'Thane', 'Maharashtra', 19.2183, 72.9781, 2, []),
+        ('secunderabad', 'Secunderabad', 'Telangana', 17.4399, 78.4983, 2, []),
+        ('howrah', 'Howrah', 'West Bengal', 22.5958, 88.2636, 2, []),
+        ('gandhinagar', 'Gandhinagar', 'Gujarat', 23.2156, 72.6369, 2, []),
+        ('surat', 'Surat', 'Gujarat', 21.1702, 72.8311, 2, []),
+        ('vadodara', 'Vadodara', 'Gujarat', 22.3072, 73.1812, 2, ['baroda']),
+        ('jaipur', 'Jaipur', 'Rajasthan', 26.9124, 75.7873, 2, []),
+        ('lucknow', 'Lucknow', 'Uttar Pradesh', 26.8467, 80.9462, 2, []),
+        ('kanpur', 'Kanpur', 'Uttar Pradesh', 26.4499, 80.3319, 2, []),
+        ('nagpur', 'Nagpur', 'Maharashtra', 21.1458, 79.0882, 2, []),
+        ('indore', 'Indore', 'Madhya Pradesh', 22.7196, 75.8577, 2, []),
+        ('bhopal', 'Bhopal', 'Madhya Pradesh', 23.2599, 77.4126, 2, []),
+        ('patna', 'Patna', 'Bihar', 25.5941, 85.1376, 2, []),
+        ('chandigarh', 'Chandigarh', 'Chandigarh', 30.7333, 76.7794, 2, ['tricity']),
+        ('mohali', 'Mohali', 'Punjab', 30.7046, 76.7179, 2, ['sas nagar']),
+        ('panchkula', 'Panchkula', 'Haryana', 30.6942, 76.8606, 2, []),
+        ('coimbatore', 'Coimbatore', 'Tamil Nadu', 11.0168, 76.9558, 2, ['kovai']),
+        ('kochi', 'Kochi', 'Kerala', 9.9312, 76.2673, 2, ['cochin', 'ernakulam']),
+        ('thiruvananthapuram', 'Thiruvananthapuram', 'Kerala', 8.5241, 76.9366, 2, ['trivandrum']),
+        ('visakhapatnam', 'Visakhapatnam', 'Andhra Pradesh', 17.6868, 83.2185, 2, ['vizag', 'vishakhapatnam']),
+        ('vijayawada', 'Vijayawada', 'Andhra Pradesh', 16.5062, 80.6480, 2, []),
+        ('bhubaneswar', 'Bhubaneswar', 'Odisha', 20.2961, 85.8245, 2, []),
+        ('guwahati', 'Guwahati', 'Assam', 26.1445, 91.7362, 2, []),
+        ('mysore', 'Mysore', 'Karnataka', 12.2958, 76.6394, 3, ['mysuru']),
+        ('mangalore', 'Mangalore', 'Karnataka', 12.9141, 74.8560, 3, ['mangaluru']),
+        ('hubli', 'Hubli', 'Karnataka', 15.3647, 75.1240, 3, ['hubballi', 'hubli-dharwad']),
+        ('panaji', 'Panaji', 'Goa', 15.4909, 73.8278, 3, ['panjim', 'goa']),
+        ('dehradun', 'Dehradun', 'Uttarakhand', 30.3165, 78.0322, 3, []),
+        ('ludhiana', 'Ludhiana', 'Punjab', 30.9010, 75.8573, 3, []),
+        ('amritsar', 'Amritsar', 'Punjab', 31.6340, 74.8723, 3, []),
+        ('nashik', 'Nashik', 'Maharashtra', 19.9975, 73.7898, 3, ['nasik']),
+        ('madurai', 'Madurai', 'Tamil Nadu', 9.9252, 78.1198, 3, []),
+        ('ranchi', 'Ranchi', 'Jharkhand', 23.3441, 85.3096, 3, []),
+        ('raipur', 'Raipur', 'Chhattisgarh', 21.2514, 81.6296, 3, []),
+        ('varanasi', 'Varanasi', 'Uttar Pradesh', 25.3176, 82.9739, 3, ['banaras', 'benares']),
+        ('agra', 'Agra', 'Uttar Pradesh', 27.1767, 78.0081, 3, [])
+    ]
+    EARTH_RADIUS_KM = 6371.0
+    CELL_DEGREES = 1.0
+    
+    def __init__(self, cities=None):
+        self.cities = {}
+        self.names = {}
+        self.grid = {}
+        for city_id, name, state, lat, lon, tier, aliases in (cities or self.CITIES):
+            self.cities[city_id] = City(city_id, name, state, lat, lon, tier)
+            for alias in [city_id, name] + aliases:
+                self.names[self.normalize(alias)] = city_id
+            self.grid.setdefault(self.cell(lat, lon), []).append(city_id)
+        
+        self.resolved = {}
+        self.neighbours = {}
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def normalize(name):
+        return re.sub(r'[\s\-]+', ' ', re.sub(r'[^\w\s\-]', '', name.lower())).strip()
+    
+    def cell(self, lat, lon):
+        return (int(lat // self.CELL_DEGREES), int(lon // self.CELL_DEGREES))
+    
+    def resolve(self, location):
+        # City id for a free-text location such as "Bengaluru, KA" or
+        # "Bangalore Urban, Karnataka", or None if no part of it is known.
+        if not location:
+            return None
+        cached = self.resolved.get(location, False)
+        if cached is not False:
+            return cached
+        
+        city_id = None
+        for part in [location] + location.split(','):
+            name = self.normalize(part)
+            city_id = self.names.get(name)
+            if city_id is None:
+                name = re.sub(r'\s+(city|district|urban|rural)$', '', name)
+                city_id = self.names.get(name)
+            if city_id is not None:
+                break
+        
+        with self.lock:
+            if len(self.resolved) > 50000:
+                self.resolved.clear()
+            self.resolved[location] = city_id
+        return city_id
+    
+    def location_key(self, location):
+        # The city id when the gazetteer knows the location, otherwise the
+        # normalised text before the first comma. Used wherever locations are
+        # grouped (cache keys, skill demand) so spellings agree everywhere.
+        city_id = self.resolve(location)
+        if city_id is not None:
+            return city_id
+        return re.sub(r'\s+', ' ', (location or '').split(',')[0].strip().lower())
+    
+    def distance_km(self, a, b):
+        a = self.cities[a]
+        b = self.cities[b]
+        lat1, lon1, lat2, lon2 = map(math.radians, (a.lat, a.lon, b.lat, b.lon))
+        h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        return 2 * self.EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+    
+    def nearby(self, city_id, radius_km=0):
+        # Ids of every city within radius_km of city_id, itself included.
+        if not radius_km:
+            return [city_id]
+        key = (city_id, radius_km)
+        if key in self.neighbours:
+            return self.neighbours[key]
+        
+        city = self.cities[city_id]
+        lat_cells = int(radius_km // (111.0 * self.CELL_DEGREES)) + 1
+        lon_cells = int(radius_km // (111.0 * self.CELL_DEGREES * max(math.cos(math.radians(city.lat)), 0.1))) + 1
+        row, col = self.cell(city.lat, city.lon)
+        
+        found = []
+        for i in range(row - lat_cells, row + lat_cells + 1):
+            for j in range(col - lon_cells, col + lon_cells + 1):
+                for other in self.grid.get((i, j), ()):
+                    if self.distance_km(city_id, other) <= radius_km:
+                        found.append(other)
+        found.sort(key=lambda other: self.distance_km(city_id, other))
+        
+        with self.lock:
+            self.neighbours[key] = found
+        return found
+    
+    def in_tier(self, tier):
+        return [city.id for city in self.cities.values() if city.tier == tier]
+
+
+class JobStore:
+    # SQLite-backed corpus of every posting we have fetched, deduped by URL
+    # (or by a hash of source/title/company/location when there is no URL).
+    # Near-duplicates from different providers are merged into the first
+    # stored record, which keeps every source URL in source_urls.
+    JOB_FIELDS = ['title', 'company', 'location', 'description', 'url', 'salary', 'posted_date', 'source']
+    
+    def __init__(self, db_path, deduplicator=None, gazetteer=None):
+        self.db_path = db_path
+        self.deduplicator = deduplicator if deduplicator is not None else JobDeduplicator()
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_key TEXT UNIQUE NOT NULL,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                description TEXT,
+                url TEXT,
+                salary TEXT,
+                posted_date TEXT,
+                source TEXT,
+                added_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_added_at ON jobs (added_at)")
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]
+        if 'source_urls' not in columns:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN source_urls TEXT")
+        # Canonical gazetteer city, or '' when the location is not a known city.
+        if 'city_id' not in columns:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN city_id TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_city_id ON jobs (city_id)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_signatures (
+                job_id INTEGER PRIMARY KEY,
+                signature BLOB NOT NULL
+            )
+        """)
+        signature_columns = [row[1] for row in self.conn.execute("PRAGMA table_info(job_signatures)")]
+        if 'version' not in signature_columns:
+            self.conn.execute("ALTER TABLE job_signatures ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        self.conn.commit()
+        
+        self.select_columns = ", ".join(['id'] + self.JOB_FIELDS + ['source_urls', 'city_id'])
+        self.signatures_loaded = False
+        self.city_ids_filled = False
+    
+    def fill_city_ids(self):
+        # Called under self.lock; resolves rows stored before city_id existed.
+        if self.city_ids_filled:
+            return
+        self.city_ids_filled = True
+        
+        rows = self.conn.execute("SELECT id, location FROM jobs WHERE city_id IS NULL").fetchall()
+        if rows:
+            self.conn.executemany(
+                "UPDATE jobs SET city_id = ? WHERE id = ?",
+                [(self.gazetteer.resolve(location or '') or '', job_id) for job_id, location in rows]
+            )
+            self.conn.commit()
+    
+    def load_signatures(self):
+        # Called under self.lock on the first write, not at startup.
+        if self.signatures_loaded:
+            return
+        self.signatures_loaded = True
+        self.fill_city_ids()
+        
+        version = self.deduplicator.VERSION
+        rows = self.conn.execute("""
+            SELECT s.job_id, s.signature, j.title, j.location, j.city_id
+            FROM job_signatures s JOIN jobs j ON j.id = s.job_id
+            WHERE s.version = ?
+        """, (version,))
+        for job_id, signature, title, location, city_id in rows:
+            identity = self.deduplicator.identity({'title': title, 'location': location}, city_id)
+            self.deduplicator.add(job_id, np.frombuffer(signature, dtype=np.uint32), identity)
+        
+        # Rows stored before signatures existed, or signed by an older
+        # shingling scheme, are signed once here.
+        rows = self.conn.execute(
+            f"SELECT {self.select_columns} FROM jobs WHERE id NOT IN "
+            "(SELECT job_id FROM job_signatures WHERE version = ?)",
+            (version,)
+        ).fetchall()
+        for row in rows:
+            job = self.row_to_job(row)
+            signature = self.deduplicator.signature(job)
+            self.deduplicator.add(job['id'], signature, self.deduplicator.identity(job, job['city_id']))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO job_signatures (job_id, signature, version) VALUES (?, ?, ?)",
+                (job['id'], signature.tobytes(), version)
+            )
+        self.conn.commit()
+    
+    @staticmethod
+    def job_key(job):
+        if job.get('url'):
+            return job['url']
+        raw = "|".join(str(job.get(field, '')).strip().lower() for field in ('source', 'title', 'company', 'location'))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def row_to_job(self, row):
+        job = dict(zip(['id'] + self.JOB_FIELDS, row[:-2]))
+        for field in self.JOB_FIELDS:
+            if job[field] is None:
+                job[field] = ''
+        job['source_urls'] = json.loads(row[-2]) if row[-2] else ([job['url']] if job['url'] else [])
+        job['city_id'] = row[-1] or ''
+        return job
+    
+    def merge_duplicate(self, job_id, job):
+        row = self.conn.execute("SELECT source, source_urls, url FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        sources = [source for source in (row[0] or '').split(' / ') if source]
+        source_urls = json.loads(row[1]) if row[1] else ([row[2]] if row[2] else [])
+        
+        if job.get('source') and job['source'] not in sources:
+            sources.append(job['source'])
+        for url in job.get('source_urls') or [job.get('url')]:
+            if url and url not in source_urls:
+                source_urls.append(url)
+        
+        self.conn.execute(
+            "UPDATE jobs SET source = ?, source_urls = ? WHERE id = ?",
+            (" / ".join(sources), json.dumps(source_urls), job_id)
+        )
+    
+    def add_jobs(self, jobs):
+        columns = ", ".join(self.JOB_FIELDS)
+        placeholders = ", ".join("?" for _ in self.JOB_FIELDS)
+        now = time.time()
+        
+        # Signatures are computed outside the lock; they are the expensive part.
+        signatures = [self.deduplicator.signature(job) for job in jobs]
+        
+        stored_jobs = []
+        new_jobs = []
+        seen_ids = set()
+        with self.lock:
+            self.load_signatures()
+            for job, signature in zip(jobs, signatures):
+                key = self.job_key(job)
+                row = self.conn.execute("SELECT id FROM jobs WHERE job_key = ?", (key,)).fetchone()
+                is_new = False
+                
+                if row is not None:
+                    job_id = row[0]
+                else:
+                    city_id = self.gazetteer.resolve(job.get('location') or '') or ''
+                    identity = self.deduplicator.identity(job, city_id)
+                    job_id = self.deduplicator.find(signature, identity)
+                    if job_id is not None:
+                        self.merge_duplicate(job_id, job)
+                    else:
+                        values = [str(job.get(field, '') or '') for field in self.JOB_FIELDS]
+                        source_urls = job.get('source_urls') or ([job['url']] if job.get('url') else [])
+                        cursor = self.conn.execute(
+                            f"INSERT INTO jobs (job_key, {columns}, source_urls, city_id, added_at) VALUES (?, {placeholders}, ?, ?, ?)",
+                            [key] + values + [json.dumps(source_urls), city_id, now]
+                        )
+                        job_id = cursor.lastrowid
+                        is_new = True
+                        self.conn.execute(
+                            "INSERT INTO job_signatures (job_id, signature, version) VALUES (?, ?, ?)",
+                            (job_id, signature.tobytes(), self.deduplicator.VERSION)
+                        )
+                        self.deduplicator.add(job_id, signature, identity)
+                
+                if job_id in seen_ids:
+                    continue
+                seen_ids.add(job_id)
+                
+                stored = dict(job)
+                stored['id'] = job_id
+                stored_jobs.append(stored)
+                if is_new:
+                    stored['source_urls'] = source_urls
+                    new_jobs.append(stored)
+            self.conn.commit()
+        
+        return stored_jobs, new_jobs
+    
+    def get_jobs(self, job_ids):
+        jobs = []
+        job_ids = list(job_ids)
+        with self.lock:
+            self.fill_city_ids()
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self.conn.execute(
+                    f"SELECT {self.select_columns} FROM jobs WHERE id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                jobs.extend(self.row_to_job(row) for row in rows)
+        
+        jobs.sort(key=lambda job: job['id'])
+        return jobs
+    
+    def get_jobs_after(self, last_id=0, limit=-1):
+        with self.lock:
+            self.fill_city_ids()
+            rows = self.conn.execute(
+                f"SELECT {self.select_columns} FROM jobs WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, limit)
+            ).fetchall()
+        return [self.row_to_job(row) for row in rows]
+    
+    def iter_jobs_after(self, last_id=0, chunk_size=1000):
+        # Lists of at most chunk_size postings, in id order, so a full pass
+        # over the corpus never holds more than one chunk.
+        while True:
+            jobs = self.get_jobs_after(last_id, chunk_size)
+            if not jobs:
+                return
+            yield jobs
+            last_id = jobs[-1]['id']
+    
+    def get_descriptions(self, job_ids):
+        descriptions = {}
+        job_ids = list(job_ids)
+        with self.lock:
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                descriptions.update(self.conn.execute(
+                    f"SELECT id, description FROM jobs WHERE id IN ({placeholders})",
+                    chunk
+                ))
+        return {job_id: description or '' for job_id, description in descriptions.items()}
+    
+    def find_job_ids(self, location, max_age_days=None, radius_km=0, tier=None):
+        # Postings in the gazetteer cities within radius_km of location; an
+        # unknown location falls back to a substring match on the raw text.
+        # tier keeps only postings in cities of that market tier, so "Delhi"
+        # with tier=1 leaves out the smaller towns around it.
+        city_id = self.gazetteer.resolve(location)
+        if city_id is not None:
+            city_ids = self.gazetteer.nearby(city_id, radius_km)
+            if tier is not None:
+                tier_ids = set(self.gazetteer.in_tier(tier))
+                city_ids = [other for other in city_ids if other in tier_ids]
+            query = f"SELECT id FROM jobs WHERE city_id IN ({', '.join('?' for _ in city_ids)})"
+            params = list(city_ids)
+        else:
+            query = "SELECT id FROM jobs WHERE lower(location) LIKE ?"
+            params = [f"%{location.strip().lower()}%"]
+            if tier is not None:
+                tier_ids = self.gazetteer.in_tier(tier)
+                query += f" AND city_id IN ({', '.join('?' for _ in tier_ids)})"
+                params.extend(tier_ids)
+        if max_age_days:
+            query += " AND added_at >= ?"
+            params.append(time.time() - max_age_days * 86400)
+        
+        with self.lock:
+            self.fill_city_ids()
+            return [row[0] for row in self.conn.execute(query + " ORDER BY id", params)]
+    
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class StringColumn:
+    # Dictionary-encoded string column: each distinct value is stored once and
+    # every row holds an int32 code into the value list.
+    def __init__(self):
+        self.codes = array('i')
+        self.values = []
+        self.lookup = {}
+    
+    def encode(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.lookup[value] = code
+        return code
+    
+    def append(self, value):
+        self.codes.append(self.encode(value))
+    
+    def __setitem__(self, row, value):
+        self.codes[row] = self.encode(value)
+    
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+    
+    def __len__(self):
+        return len(self.codes)
+
+
+class JobTable:
+    # Column-oriented, in-memory copy of the JobStore used on the search path.
+    # Low-cardinality fields are dictionary-encoded. Descriptions, and the
+    # lowercased "title description" text every matching stage needs, are the
+    # bulk of a posting, so only the most recently used max_descriptions are
+    # kept; the rest are read back from the store in one query per batch.
+    # Rows are handed out as JobRecord/JobView objects that read the columns
+    # in place instead of copying them into dicts.
+    INTERNED_FIELDS = ('title', 'company', 'location', 'salary', 'posted_date', 'source', 'city_id')
+    # Rows per text_chunks() batch: whole-corpus passes hold one chunk of
+    # texts at a time instead of every description at once.
+    TEXT_CHUNK_ROWS = 1000
+    
+    def __init__(self, store, max_descriptions=20000):
+        self.store = store
+        self.ids = array('q')
+        self.positions = {}
+        self.columns = {
+            field: StringColumn() if field in self.INTERNED_FIELDS else []
+            for field in JobStore.JOB_FIELDS + ['city_id'] if field != 'description'
+        }
+        # row -> (description, text), least recently used first.
+        self.descriptions = OrderedDict()
+        self.max_descriptions = max_descriptions
+        # Only postings with more than their own URL keep a source_urls list.
+        self.extra_urls = {}
+        self.lock = threading.RLock()
+        self.loaded = False
+        # Highest store id read by sync(); rows are not kept in id order, so
+        # this is tracked apart from self.ids.
+        self.synced_id = 0
+    
+    @staticmethod
+    def normalize_text(title, description):
+        return f"{title} {description}".lower()
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def ensure_loaded(self):
+        with self.lock:
+            if not self.loaded:
+                self.loaded = True
+                self.sync()
+    
+    def sync(self):
+        with self.lock:
+            self.loaded = True
+            for jobs in self.store.iter_jobs_after(self.synced_id):
+                self.add(jobs)
+                self.synced_id = max(self.synced_id, jobs[-1]['id'])
+    
+    def add(self, jobs):
+        with self.lock:
+            for job in jobs:
+                row = self.positions.get(job['id'])
+                if row is None:
+                    row = len(self.ids)
+                    for field, column in self.columns.items():
+                        column.append(job[field])
+                    self.positions[job['id']] = row
+                    self.ids.append(job['id'])
+                else:
+                    for field, column in self.columns.items():
+                        column[row] = job[field]
+                self.cache_description(row, job['description'])
+                
+                source_urls = job.get('source_urls') or []
+                if source_urls and source_urls != [job['url']]:
+                    self.extra_urls[row] = list(source_urls)
+                else:
+                    self.extra_urls.pop(row, None)
+    
+    def refresh(self, job_ids):
+        # Re-reads postings whose stored record may have changed (merged
+        # duplicates gain sources and URLs). Only rows already in the table
+        # are updated; new postings arrive in id order through sync().
+        with self.lock:
+            job_ids = [job_id for job_id in job_ids if job_id in self.positions]
+        if job_ids:
+            self.add(self.store.get_jobs(job_ids))
+    
+    def records(self, job_ids):
+        # JobView over the given ids, in the order given.
+        self.ensure_loaded()
+        job_ids = list(job_ids)
+        if any(job_id not in self.positions for job_id in job_ids):
+            self.sync()
+        rows = [self.positions[job_id] for job_id in job_ids if job_id in self.positions]
+        return JobView(self, rows)
+    
+    def cache_description(self, row, description):
+        # Called under self.lock.
+        entry = self.descriptions[row] = (description, self.normalize_text(self.columns['title'][row], description))
+        self.descriptions.move_to_end(row)
+        while len(self.descriptions) > self.max_descriptions:
+            self.descriptions.popitem(last=False)
+        return entry
+    
+    def description_entries(self, rows):
+        # (description, text) for each row, reading evicted rows back from
+        # the store together.
+        with self.lock:
+            entries = [self.descriptions.get(row) for row in rows]
+            for row, entry in zip(rows, entries):
+                if entry is not None:
+                    self.descriptions.move_to_end(row)
+            missing = [self.ids[row] for row, entry in zip(rows, entries) if entry is None]
+        if not missing:
+            return entries
+        
+        descriptions = self.store.get_descriptions(missing)
+        with self.lock:
+            for i, row in enumerate(rows):
+                if entries[i] is None:
+                    entries[i] = self.cache_description(row, descriptions.get(self.ids[row], ''))
+        return entries
+    
+    def texts(self, rows):
+        return [entry[1] for entry in self.description_entries(rows)]
+    
+    def text_chunks(self, rows):
+        # Yields (start, texts) for consecutive TEXT_CHUNK_ROWS slices of rows.
+        for start in range(0, len(rows), self.TEXT_CHUNK_ROWS):
+            yield start, self.texts(rows[start:start + self.TEXT_CHUNK_ROWS])
+    
+    def source_urls(self, row):
+        urls = self.extra_urls.get(row)
+        if urls is not None:
+            return list(urls)
+        url = self.columns['url'][row]
+        return [url] if url else []
+
+
+class JobRecord(Mapping):
+    # Read-only dict-like view of one JobTable row.
+    __slots__ = ('table', 'row')
+    KEYS = ['id'] + JobStore.JOB_FIELDS + ['source_urls']
+    
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+    
+    def __getitem__(self, key):
+        if key == 'id':
+            return self.table.ids[self.row]
+        if key == 'source_urls':
+            return self.table.source_urls(self.row)
+        if key == 'description':
+            return self.table.description_entries([self.row])[0][0]
+        column = self.table.columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        return column[self.row]
+    
+    def __iter__(self):
+        return iter(self.KEYS)
+    
+    def __len__(self):
+        return len(self.KEYS)
+    
+    def __repr__(self):
+        return f"JobRecord({dict(self)!r})"
+    
+    @property
+    def text(self):
+        return self.table.texts([self.row])[0]
+
+
+class JobView(Sequence):
+    # A list of JobTable rows. texts returns the precomputed job texts without
+    # rebuilding them, fetching any evicted ones in a single store query.
+    __slots__ = ('table', 'rows')
+    
+    def __init__(self, table, rows):
+        self.table = table
+        self.rows = rows
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return JobView(self.table, self.rows[index])
+        return JobRecord(self.table, self.rows[index])
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    @property
+    def ids(self):
+        return [self.table.ids[row] for row in self.rows]
+    
+    @property
+    def texts(self):
+        return self.table.texts(self.rows)
+    
+    def text_chunks(self):
+        return self.table.text_chunks(self.rows)
+
+
+def job_texts(jobs):
+    if isinstance(jobs, JobView):
+        return jobs.texts
+    return [JobIndex.job_text(job) for job in jobs]
+
+
+class InvertedIndex:
+    # Term-at-a-time max-score retrieval over the L2-normalised TF-IDF rows.
+    # Query terms are visited in order of their best possible contribution;
+    # once the terms left cannot lift an unseen job above the current k-th
+    # partial score, no new candidates are admitted and the survivors are
+    # re-scored exactly against the row matrix. Rows appended after the last
+    # build are brute-forced until they reach merge_fraction of the index.
+    # Instances are never modified: update() returns a new index, so a search
+    # running outside JobIndex.lock keeps a consistent view of its rows. Rows
+    # are read from the base matrix (possibly memory-mapped) and the in-memory
+    # delta of rows appended since, without stacking the two.
+    def __init__(self, base, delta=None, merge_fraction=0.1, postings=None):
+        self.merge_fraction = merge_fraction
+        self.base = base
+        self.delta = delta
+        self.n_rows = base.shape[0] + (delta.shape[0] if delta is not None else 0)
+        if postings is None:
+            postings = self.build_postings(base if delta is None else sparse.vstack([base, delta], format='csr'))
+        self.indptr, self.indices, self.data, self.max_weights, self.n_indexed = postings
+    
+    @staticmethod
+    def build_postings(rows):
+        postings = rows.tocsc()
+        postings.sort_indices()
+        indptr = postings.indptr
+        
+        max_weights = np.zeros(rows.shape[1], dtype=np.float64)
+        non_empty = np.diff(indptr) > 0
+        if non_empty.any():
+            max_weights[non_empty] = np.maximum.reduceat(postings.data, indptr[:-1][non_empty])
+        return indptr, postings.indices, postings.data, max_weights, rows.shape[0]
+    
+    def update(self, delta):
+        # delta holds every row appended to the base matrix so far.
+        n_rows = self.base.shape[0] + delta.shape[0]
+        if n_rows - self.n_indexed > self.merge_fraction * max(self.n_indexed, 1):
+            return InvertedIndex(self.base, delta, self.merge_fraction)
+        postings = (self.indptr, self.indices, self.data, self.max_weights, self.n_indexed)
+        return InvertedIndex(self.base, delta, self.merge_fraction, postings)
+    
+    def exact_scores(self, rows, query_vector):
+        n_base = self.base.shape[0]
+        in_base = rows < n_base
+        scores = np.zeros(len(rows), dtype=np.float64)
+        if in_base.any():
+            scores[in_base] = np.asarray((self.base[rows[in_base]] @ query_vector.T).todense()).ravel()
+        if not in_base.all():
+            scores[~in_base] = np.asarray((self.delta[rows[~in_base] - n_base] @ query_vector.T).todense()).ravel()
+        return scores
+    
+    def search(self, query_vector, k, allowed=None, stats=None):
+        n_indexed = self.n_indexed
+        query_vector = query_vector.tocsr()
+        terms = query_vector.indices
+        weights = query_vector.data
+        
+        upper = weights * self.max_weights[terms]
+        order = np.argsort(-upper, kind='stable')
+        terms = terms[order]
+        weights = weights[order]
+        upper = upper[order]
+        remaining = np.append(np.cumsum(upper[::-1])[::-1], 0.0)
+        
+        # Per-term work is bounded by the postings visited: candidates are
+        # collected as they are first seen instead of rescanning every row.
+        partial = np.zeros(n_indexed, dtype=np.float64)
+        seen = np.zeros(n_indexed, dtype=bool)
+        seen_rows = []
+        n_seen = 0
+        threshold = -np.inf
+        scanned = 0
+        stopped_at = len(terms)
+        
+        for i, term in enumerate(terms):
+            if n_seen >= k and remaining[i] < threshold:
+                stopped_at = i
+                break
+            
+            start, end = self.indptr[term], self.indptr[term + 1]
+            doc_rows = self.indices[start:end]
+            doc_weights = self.data[start:end]
+            if allowed is not None:
+                keep = allowed[doc_rows]
+                doc_rows = doc_rows[keep]
+                doc_weights = doc_weights[keep]
+            
+            partial[doc_rows] += weights[i] * doc_weights
+            new_rows = doc_rows[~seen[doc_rows]]
+            if len(new_rows):
+                seen[new_rows] = True
+                seen_rows.append(new_rows)
+                n_seen += len(new_rows)
+            scanned += end - start
+            
+            if n_seen >= k and len(doc_rows):
+                seen_rows = [np.concatenate(seen_rows)]
+                candidate_scores = partial[seen_rows[0]]
+                threshold = np.partition(candidate_scores, n_seen - k)[n_seen - k]
+        
+        # A candidate can only make the top k if its partial score plus every
+        # term it was not yet scored on could reach the threshold.
+        candidates = np.concatenate(seen_rows) if seen_rows else np.zeros(0, dtype=np.int64)
+        candidates = candidates[partial[candidates] + remaining[stopped_at] >= threshold]
+        
+        delta = np.arange(n_indexed, self.n_rows)
+        if allowed is not None:
+            delta = delta[allowed[delta]]
+        candidates = np.concatenate([candidates, delta])
+        
+        if stats is not None:
+            stats['postings_scanned'] = scanned
+            stats['postings_total'] = int(sum(self.indptr[t + 1] - self.indptr[t] for t in terms))
+            stats['candidates'] = len(candidates)
+        
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        
+        exact = self.exact_scores(candidates, query_vector)
+        top = top_k_indices(exact[np.newaxis, :], k)[0]
+        top = top[exact[top] > 0]
+        return candidates[top], exact[top]
+
+
+class JobIndex:
+    # TF-IDF matrix over the whole JobStore. New postings are transformed with
+    # the current vocabulary and appended; the vocabulary and IDF weights are
+    # only refit in the background once the schedule says they are stale.
+    # Appended rows live in a separate in-memory delta matrix, so the base
+    # matrix (memory-mapped after load) is never copied until refit or save.
+    # Appends are buffered as chunks and only stacked onto the delta when a
+    # reader needs it, so a long ingest does not re-copy the delta per batch.
+    def __init__(self, store, index_path, max_features=1000, refit_interval=6 * 3600, refit_growth=0.25):
+        self.store = store
+        self.index_path = index_path
+        self.max_features = max_features
+        self.refit_interval = refit_interval
+        self.refit_growth = refit_growth
+        
+        self.vectorizer = None
+        self.matrix = None
+        self.delta = None
+        self.pending = []
+        self.row_ids = []
+        self.positions = {}
+        self.fitted_at = 0.0
+        self.fitted_rows = 0
+        
+        self.lock = threading.RLock()
+        self.refit_thread = None
+        self.retrieval = None
+        
+        # The saved index is loaded on first use (or by prewarm()), keeping
+        # agent construction cheap. Only refits are saved: rows appended since
+        # are caught up from the store on load, so short-lived workers never
+        # rewrite the shared index on exit.
+        self.loaded = False
+        self.unsaved = False
+    
+    @staticmethod
+    def job_text(job):
+        if isinstance(job, JobRecord):
+            return job.text
+        return JobTable.normalize_text(job['title'], job['description'])
+    
+    def ensure_loaded(self):
+        with self.lock:
+            if not self.loaded:
+                self.loaded = True
+                self.load()
+    
+    def array_path(self, generation, part):
+        if generation is None:
+            return f"{self.index_path}.{part}.npy"
+        return f"{self.index_path}.{generation}.{part}.npy"
+    
+    def load(self):
+        # The matrix arrays are memory-mapped read-only, so workers forked from
+        # the same saved index share its pages instead of each reading a copy.
+        try:
+            with open(self.index_path + '.pkl', 'rb') as f:
+                meta = pickle.load(f)
+            generation = meta.get('generation')
+            arrays = [np.load(self.array_path(generation, part), mmap_mode='r') for part in ('data', 'indices', 'indptr')]
+            if len(arrays[0]) != meta['nnz'] or len(arrays[2]) != meta['shape'][0] + 1:
+                raise ValueError("index arrays do not match their metadata")
+            matrix = sparse.csr_matrix(tuple(arrays), shape=meta['shape'], copy=False)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Could not load saved job index, it will be rebuilt: {e}")
+            return
+        
+        with self.lock:
+            self.vectorizer = meta['vectorizer']
+            self.row_ids = list(meta['row_ids'])
+            self.positions = {job_id: i for i, job_id in enumerate(self.row_ids)}
+            self.fitted_at = meta['fitted_at']
+            self.fitted_rows = meta['fitted_rows']
+            self.matrix = matrix
+            self.delta = None
+            self.pending = []
+            self.retrieval = None
+            
+            # Postings stored after the last save are caught up incrementally.
+            last_id = self.row_ids[-1] if self.row_ids else 0
+            for jobs in self.store.iter_jobs_after(last_id):
+                self.append_jobs(jobs)
+    
+    def save(self):
+        # Each save writes its arrays under a new generation name and then
+        # swaps in the metadata that points at them, so processes saving at
+        # the same time can never pair one's arrays with another's metadata.
+        generation = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        with self.lock:
+            if self.vectorizer is None or self.matrix is None:
+                return
+            matrix = self.full_matrix()
+            meta = {
+                'vectorizer': self.vectorizer,
+                'row_ids': list(self.row_ids),
+                'fitted_at': self.fitted_at,
+                'fitted_rows': self.fitted_rows,
+                'shape': matrix.shape,
+                'nnz': matrix.nnz,
+                'generation': generation
+            }
+        
+        try:
+            with open(self.index_path + '.pkl', 'rb') as f:
+                previous = pickle.load(f).get('generation')
+        except Exception:
+            previous = False
+        
+        for part in ('data', 'indices', 'indptr'):
+            with open(self.array_path(generation, part), 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(matrix, part)))
+        tmp_path = f"{self.index_path}.{generation}.tmp.pkl"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(meta, f)
+        os.replace(tmp_path, self.index_path + '.pkl')
+        self.unsaved = False
+        
+        # Workers that already mapped the old arrays keep them until they exit.
+        if previous is not False:
+            for part in ('data', 'indices', 'indptr'):
+                try:
+                    os.remove(self.array_path(previous, part))
+                except OSError:
+                    pass
+    
+    def append_jobs(self, jobs):
+        jobs = [job for job in jobs if job['id'] not in self.positions]
+        if not jobs:
+            return
+        
+        vectors = self.vectorizer.transform([self.job_text(job) for job in jobs]).tocsr()
+        if self.matrix is None:
+            self.matrix = vectors
+        else:
+            self.pending.append(vectors)
+        for job in jobs:
+            self.positions[job['id']] = len(self.row_ids)
+            self.row_ids.append(job['id'])
+    
+    def merge_pending(self):
+        # Stacks buffered appends onto the delta; callers hold self.lock.
+        if not self.pending:
+            return
+        parts = ([self.delta] if self.delta is not None else []) + self.pending
+        self.delta = sparse.vstack(parts, format='csr') if len(parts) > 1 else parts[0]
+        self.pending = []
+        if self.retrieval is not None:
+            self.retrieval = self.retrieval.update(self.delta)
+    
+    def full_matrix(self):
+        # Base and delta stacked into one new matrix; callers hold self.lock.
+        self.merge_pending()
+        if self.delta is None:
+            return self.matrix
+        return sparse.vstack([self.matrix, self.delta], format='csr')
+    
+    def row_vectors(self, positions):
+        self.merge_pending()
+        positions = np.asarray(positions, dtype=np.int64)
+        n_base = self.matrix.shape[0]
+        if self.delta is None or not (positions >= n_base).any():
+            return self.matrix[positions]
+        in_base = positions < n_base
+        parts = sparse.vstack([self.matrix[positions[in_base]], self.delta[positions[~in_base] - n_base]], format='csr')
+        order = np.concatenate([np.flatnonzero(in_base), np.flatnonzero(~in_base)])
+        return parts[np.argsort(order, kind='stable')]
+    
+    def add_jobs(self, jobs):
+        self.ensure_loaded()
+        with self.lock:
+            if self.vectorizer is None:
+                # Nothing to append to yet, so the first fit has to happen inline.
+                self.refit()
+                return
+            self.append_jobs(jobs)
+        
+        self.maybe_schedule_refit()
+    
+    def needs_refit(self):
+        if self.vectorizer is None:
+            return True
+        if time.time() - self.fitted_at > self.refit_interval:
+            return True
+        return len(self.row_ids) > self.fitted_rows * (1 + self.refit_growth)
+    
+    def maybe_schedule_refit(self):
+        with self.lock:
+            if not self.needs_refit():
+                return
+            if self.refit_thread is not None and self.refit_thread.is_alive():
+                return
+            self.refit_thread = threading.Thread(target=self.refit, name='ascend-index-refit', daemon=True)
+            self.refit_thread.start()
+    
+    def refit(self):
+        # The corpus is streamed through the vectorizer a chunk at a time;
+        # only the sparse matrix it produces is held in memory.
+        if self.store.count() == 0:
+            return
+        row_ids = []
+        
+        def corpus_texts():
+            for jobs in self.store.iter_jobs_after(0):
+                for job in jobs:
+                    row_ids.append(job['id'])
+                    yield self.job_text(job)
+        
+        vectorizer = sklearn_text.TfidfVectorizer(stop_words='english', max_features=self.max_features)
+        try:
+            matrix = vectorizer.fit_transform(corpus_texts()).tocsr()
+        except ValueError as e:
+            print(f"Could not fit job index: {e}")
+            return
+        
+        with self.lock:
+            self.loaded = True
+            self.vectorizer = vectorizer
+            self.matrix = matrix
+            self.delta = None
+            self.pending = []
+            self.retrieval = None
+            self.row_ids = row_ids
+            self.positions = {job_id: i for i, job_id in enumerate(self.row_ids)}
+            self.fitted_at = time.time()
+            self.fitted_rows = len(self.row_ids)
+            self.unsaved = True
+            
+            # Pick up anything stored while the fit was running.
+            for jobs in self.store.iter_jobs_after(self.row_ids[-1]):
+                self.append_jobs(jobs)
+        
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Could not save job index: {e}")
+    
+    def get_vectors(self, jobs):
+        self.ensure_loaded()
+        with self.lock:
+            missing = [job for job in jobs if job['id'] not in self.positions]
+            if missing:
+                if self.vectorizer is None:
+                    self.refit()
+                self.append_jobs(missing)
+            
+            rows = [self.positions[job['id']] for job in jobs]
+            return self.vectorizer, self.row_vectors(rows)
+    
+    def snapshot(self):
+        self.ensure_loaded()
+        with self.lock:
+            matrix = self.full_matrix() if self.matrix is not None else None
+            return self.vectorizer, matrix, list(self.row_ids)
+    
+    def search(self, query, k=10, allowed_ids=None, stats=None):
+        # Top-k job ids by TF-IDF cosine similarity to the query text, as a
+        # list of (job_id, score). allowed_ids restricts the candidates.
+        self.ensure_loaded()
+        with self.lock:
+            if self.vectorizer is None or self.matrix is None:
+                return []
+            self.merge_pending()
+            if self.retrieval is None:
+                self.retrieval = InvertedIndex(self.matrix, self.delta)
+            retrieval = self.retrieval
+            row_ids = np.asarray(self.row_ids, dtype=np.int64)
+            query_vector = self.vectorizer.transform([query])
+            allowed = None
+            if allowed_ids is not None:
+                allowed = np.zeros(len(row_ids), dtype=bool)
+                allowed[[self.positions[job_id] for job_id in allowed_ids if job_id in self.positions]] = True
+        
+        rows, scores = retrieval.search(query_vector, k, allowed, stats)
+        return list(zip(row_ids[rows].tolist(), scores.tolist()))
+    
+    def measure_recall(self, queries, k=10):
+        # Compares search() with a brute-force scan of every row.
+        vectorizer, matrix, row_ids = self.snapshot()
+        if vectorizer is None or not queries:
+            return {'recall': 1.0, 'postings_scanned_ratio': 0.0}
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        
+        recalls = []
+        scanned = 0
+        total = 0
+        for query in queries:
+            stats = {}
+            found = set(job_id for job_id, _ in self.search(query, k, stats=stats))
+            
+            exact = np.asarray((matrix @ vectorizer.transform([query]).T).todense()).ravel()
+            top = top_k_indices(exact[np.newaxis, :], k)[0]
+            expected = set(row_ids[top[exact[top] > 0]].tolist())
+            
+            recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+            scanned += stats.get('postings_scanned', 0)
+            total += stats.get('postings_total', 0)
+        
+        return {
+            'recall': float(np.mean(recalls)),
+            'postings_scanned_ratio': float(scanned / total) if total else 0.0
+        }
+    
+    def close(self):
+        # Only a refit whose save failed is retried here.
+        if not self.unsaved:
+            return
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Could not save job index: {e}")
+
+
+class ProviderCache:
+    # Two-tier (in-process LRU + SQLite) cache of provider responses keyed by a
+    # normalized (provider, city, skills) tuple, with cities resolved through
+    # the gazetteer. Stale entries are served while
+    # a single background refresh runs, and identical concurrent misses share
+    # one upstream call.
+    def __init__(self, db_path, max_entries=512, disk_max_age=7 * 86400, executor=None, tracer=None, gazetteer=None):
+        self.max_entries = max_entries
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer()
+        self.disk_max_age = disk_max_age
+        self.executor = executor
+        self.tracer = tracer if tracer is not None else Tracer()
+        
+        self.ttls = {}
+        self.stale_ttls = {}
+        self.quotas = {}
+        
+        self.memory = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                jobs TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS quota_usage (
+                provider TEXT NOT NULL,
+                period TEXT NOT NULL,
+                calls INTEGER NOT NULL,
+                PRIMARY KEY (provider, period)
+            )
+        """)
+        self.conn.commit()
+    
+    def configure(self, provider, ttl, stale_ttl=0, monthly_quota=None):
+        self.ttls[provider] = ttl
+        self.stale_ttls[provider] = stale_ttl
+        if monthly_quota:
+            self.quotas[provider] = monthly_quota
+    
+    @staticmethod
+    def normalize_query(skills_query):
+        skills = set(re.sub(r'\s+', ' ', skill.strip().lower()) for skill in skills_query.split(','))
+        skills.discard('')
+        return ",".join(sorted(skills))
+    
+    def cache_key(self, provider, location, skills_query):
+        return f"{provider}|{self.gazetteer.location_key(location)}|{self.normalize_query(skills_query)}"
+    
+    def lookup(self, key):
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+                return entry
+        
+        with self.db_lock:
+            row = self.conn.execute("SELECT jobs, fetched_at FROM responses WHERE cache_key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        
+        entry = (json.loads(row[0]), row[1])
+        self.remember(key, entry)
+        return entry
+    
+    def remember(self, key, entry):
+        with self.lock:
+            self.memory[key] = entry
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+    
+    def store(self, key, provider, jobs):
+        fetched_at = time.time()
+        self.remember(key, (jobs, fetched_at))
+        
+        with self.db_lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, provider, jobs, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, provider, json.dumps(jobs), fetched_at)
+            )
+            self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (fetched_at - self.disk_max_age,))
+            self.conn.commit()
+    
+    def get(self, provider, location, skills_query, fetch_function):
+        if provider not in self.ttls:
+            return fetch_function(location, skills_query)
+        
+        key = self.cache_key(provider, location, skills_query)
+        entry = self.lookup(key)
+        
+        if entry is not None:
+            jobs, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < self.ttls[provider]:
+                self.hits += 1
+                self.tracer.count('cache.hit', provider=provider)
+                return [dict(job) for job in jobs]
+            if age < self.ttls[provider] + self.stale_ttls[provider] or self.quota_exhausted(provider):
+                self.stale_hits += 1
+                self.tracer.count('cache.stale_hit', provider=provider)
+                if not self.quota_exhausted(provider):
+                    self.revalidate(key, provider, location, skills_query, fetch_function)
+                return [dict(job) for job in jobs]
+        
+        self.misses += 1
+        self.tracer.count('cache.miss', provider=provider)
+        return [dict(job) for job in self.fetch_coalesced(key, provider, location, skills_query, fetch_function)]
+    
+    def revalidate(self, key, provider, location, skills_query, fetch_function):
+        with self.lock:
+            if key in self.inflight:
+                return
+        
+        def refresh():
+            try:
+                self.fetch_coalesced(key, provider, location, skills_query, fetch_function)
+            except Exception as e:
+                print(f"Background refresh for {provider} failed: {e}")
+        
+        if self.executor is not None:
+            self.executor.submit(refresh)
+        else:
+            threading.Thread(target=refresh, daemon=True).start()
+    
+    def fetch_coalesced(self, key, provider, location, skills_query, fetch_function):
+        with self.lock:
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            # Quota is recorded by ProviderResilience as requests go out, so a
+            # fetch skipped by an open breaker costs nothing.
+            jobs = fetch_function(location, skills_query) or []
+            # Empty responses are usually provider errors, so they are never cached.
+            if jobs:
+                self.store(key, provider, jobs)
+            future.set_result(jobs)
+            return jobs
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+    
+    @staticmethod
+    def current_period():
+        return time.strftime('%Y-%m', time.gmtime())
+    
+    def record_call(self, provider):
+        period = self.current_period()
+        with self.db_lock:
+            self.conn.execute(
+                "INSERT INTO quota_usage (provider, period, calls) VALUES (?, ?, 1) "
+                "ON CONFLICT (provider, period) DO UPDATE SET calls = calls + 1",
+                (provider, period)
+            )
+            self.conn.commit()
+        
+        used, quota = self.quota_usage(provider)
+        if quota and used >= quota * 0.9:
+            print(f"Warning: {provider} has used {used}/{quota} requests this month")
+    
+    def quota_usage(self, provider):
+        with self.db_lock:
+            row = self.conn.execute(
+                "SELECT calls FROM quota_usage WHERE provider = ? AND period = ?",
+                (provider, self.current_period())
+            ).fetchone()
+        return (row[0] if row else 0), self.quotas.get(provider)
+    
+    def quota_exhausted(self, provider):
+        used, quota = self.quota_usage(provider)
+        return bool(quota) and used >= quota
+    
+    def close(self):
+        with self.db_lock:
+            self.conn.close()
+
+
+class SkillMatcher:
+    # Compiles a user's skills (plus known aliases) into one word-bounded regex
+    # so each job text is scanned once, whatever the number of skills. Short
+    # skills such as "r" or "go" only match as whole tokens.
+    SKILL_ALIASES = [
+        ['machine learning', 'ml'],
+        ['artificial intelligence', 'ai'],
+        ['natural language processing', 'nlp'],
+        ['deep learning', 'dl'],
+        ['javascript', 'js'],
+        ['typescript', 'ts'],
+        ['golang', 'go'],
+        ['node.js', 'nodejs', 'node'],
+        ['react', 'reactjs', 'react.js'],
+        ['postgresql', 'postgres'],
+        ['kubernetes', 'k8s'],
+        ['amazon web services', 'aws'],
+        ['google cloud platform', 'gcp'],
+        ['c++', 'cpp'],
+        ['c#', 'csharp'],
+        ['power bi', 'powerbi'],
+        ['excel', 'ms excel', 'microsoft excel'],
+        ['data analysis', 'data analytics'],
+        ['user experience', 'ux'],
+        ['user interface', 'ui'],
+        ['search engine optimization', 'seo'],
+        ['customer relationship management', 'crm']
+    ]
+    # Skills recognised in job text beyond a user's own list, e.g. by
+    # SkillDemand and PromptBuilder. Alias groups above are included by
+    # lexicon().
+    SKILL_LEXICON = [
+        'python', 'java', 'sql', 'scala', 'kotlin', 'swift', 'php', 'ruby', 'rust', 'html', 'css',
+        'angular', 'vue', 'django', 'flask', 'spring boot', '.net', 'mysql', 'mongodb', 'redis', 'oracle',
+        'azure', 'docker', 'terraform', 'jenkins', 'git', 'linux', 'spark', 'hadoop', 'kafka', 'airflow',
+        'tableau', 'statistics', 'pandas', 'numpy', 'tensorflow', 'pytorch', 'selenium', 'android', 'ios',
+        'flutter', 'figma', 'photoshop', 'sap', 'salesforce', 'digital marketing', 'content writing',
+        'tally', 'gst', 'accounting', 'bookkeeping', 'payroll', 'taxation', 'auditing', 'communication',
+        'negotiation', 'customer service', 'autocad', 'solidworks', 'welding', 'plc'
+    ]
+    # Aliases that are ordinary words (or other abbreviations) in postings.
+    AMBIGUOUS_ALIASES = {'go', 'node', 'ts', 'dl', 'ui'}
+    
+    _lexicon = None
+    
+    @classmethod
+    def lexicon(cls):
+        # Shared matcher over every known skill; matched_skills() indexes
+        # into its skills list, whose names are canonical.
+        if cls._lexicon is None:
+            cls._lexicon = cls(cls.SKILL_LEXICON + [group[0] for group in cls.SKILL_ALIASES], skip_surfaces=cls.AMBIGUOUS_ALIASES)
+        return cls._lexicon
+    
+    def __init__(self, skills, skip_surfaces=()):
+        if isinstance(skills, str):
+            skills = skills.split(',')
+        
+        self.skills = []
+        for skill in skills:
+            skill = self.normalize(skill)
+            if skill and skill not in self.skills:
+                self.skills.append(skill)
+        
+        aliases = {}
+        for group in self.SKILL_ALIASES:
+            for name in group:
+                aliases[name] = group
+        
+        self.surface_skills = {}
+        for i, skill in enumerate(self.skills):
+            for surface in aliases.get(skill, [skill]):
+                if surface not in skip_surfaces:
+                    self.surface_skills.setdefault(surface, []).append(i)
+        
+        # Longest surfaces first so "machine learning" wins over "machine".
+        surfaces = sorted(self.surface_skills, key=len, reverse=True)
+        alternation = "|".join(r'[\s\-]+'.join(re.escape(part) for part in surface.split(' ')) for surface in surfaces)
+        self.pattern = re.compile(r'(?<![\w+#&])(' + alternation + r')(?![\w+#&])') if surfaces else None
+    
+    @staticmethod
+    def normalize(text):
+        return re.sub(r'[\s\-]+', ' ', text.strip().lower())
+    
+    def matched_skills(self, text):
+        found = set()
+        if self.pattern is None:
+            return found
+        for surface in self.pattern.findall(text.lower()):
+            found.update(self.surface_skills[self.normalize(surface)])
+        return found
+    
+    def incidence(self, job_texts):
+        # Sparse (jobs x skills) 0/1 matrix of which skills each job mentions.
+        rows = []
+        cols = []
+        for row, text in enumerate(job_texts):
+            for col in self.matched_skills(text):
+                rows.append(row)
+                cols.append(col)
+        
+        data = np.ones(len(rows), dtype=np.float64)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(job_texts), len(self.skills)))
+    
+    def relevance(self, job_texts):
+        if not self.skills:
+            return np.zeros(len(job_texts), dtype=np.float64)
+        counts = np.asarray(self.incidence(job_texts).sum(axis=1)).ravel()
+        return counts / len(self.skills) * 100
+
+
+class SkillDemand:
+    # Running counts of how many postings mention each known skill (the
+    # SkillMatcher lexicon), per city and for the last WINDOWS days, fed from
+    # the JobTable as postings arrive. Only lexicon skills are counted, so
+    # employer boilerplate and place names never rank as demand.
+    # Each window's totals are kept current by adding new postings and
+    # subtracting whole days as they fall out. Suggestions are then a lookup
+    # in a cached ranking rather than a tokenizing pass over a few postings.
+    WINDOWS = (7, 30)
+    ALL_CITIES = '*'
+    RANKING_SIZE = 200
+    
+    def __init__(self, table, windows=None, min_city_postings=20):
+        self.table = table
+        self.windows = tuple(windows or self.WINDOWS)
+        self.max_window = max(self.windows)
+        self.min_city_postings = min_city_postings
+        
+        self.days = {}
+        self.totals = {}
+        self.postings = {}
+        self.horizons = {}
+        self.rankings = {}
+        self.rows_counted = 0
+        self.lock = threading.Lock()
+        
+        self.known_skills = SkillMatcher.lexicon()
+        self.gazetteer = table.store.gazetteer
+    
+    @staticmethod
+    def today():
+        return int(time.time() // 86400)
+    
+    @classmethod
+    def posting_day(cls, posted_date, today):
+        try:
+            day = (datetime.strptime(posted_date[:10], '%Y-%m-%d') - datetime(1970, 1, 1)).days
+        except (TypeError, ValueError):
+            return today
+        return min(day, today)
+    
+    def terms(self, text):
+        return {self.known_skills.skills[i] for i in self.known_skills.matched_skills(text)}
+    
+    def update(self):
+        # Counts table rows appended since the last call.
+        self.table.ensure_loaded()
+        with self.lock:
+            end = len(self.table)
+            if self.rows_counted >= end:
+                return
+            today = self.today()
+            first = self.rows_counted
+            locations = self.table.columns['location']
+            city_ids = self.table.columns['city_id']
+            posted_dates = self.table.columns['posted_date']
+            # Dates and locations repeat heavily, so each is parsed once.
+            days = {}
+            cities = {}
+            for start, texts in self.table.text_chunks(range(first, end)):
+                for offset, text in enumerate(texts):
+                    row = first + start + offset
+                    posted_date = posted_dates[row]
+                    day = days.get(posted_date)
+                    if day is None:
+                        day = days[posted_date] = self.posting_day(posted_date, today)
+                    if day <= today - self.max_window:
+                        continue
+                    terms = self.terms(text)
+                    # Postings are keyed by the city_id resolved at ingest; only
+                    # unknown locations fall back to their raw text.
+                    city = city_ids[row]
+                    if not city:
+                        location = locations[row]
+                        city = cities.get(location)
+                        if city is None:
+                            city = cities[location] = self.gazetteer.location_key(location)
+                    for key in (city, self.ALL_CITIES):
+                        self.add(key, day, terms, today)
+                # A chunk is counted once it is fully added.
+                self.rows_counted = first + start + len(texts)
+    
+    def add(self, city, day, terms, today):
+        buckets = self.days.setdefault(city, {})
+        bucket = buckets.get(day)
+        if bucket is None:
+            bucket = buckets[day] = [Counter(), 0]
+        bucket[0].update(terms)
+        bucket[1] += 1
+        
+        for window in self.windows:
+            key = (city, window)
+            self.expire(city, window, today)
+            if day >= self.horizons[key]:
+                self.totals[key].update(terms)
+                self.postings[key] += 1
+                self.rankings.pop(key, None)
+    
+    def expire(self, city, window, today):
+        key = (city, window)
+        start = today - window + 1
+        if key not in self.horizons:
+            self.horizons[key] = start
+            self.totals[key] = Counter()
+            self.postings[key] = 0
+            return
+        
+        buckets = self.days.get(city, {})
+        for day in range(self.horizons[key], start):
+            bucket = buckets.get(day)
+            if bucket is not None:
+                self.totals[key].subtract(bucket[0])
+                self.postings[key] -= bucket[1]
+                self.rankings.pop(key, None)
+        if self.horizons[key] < start:
+            self.totals[key] = +self.totals[key]
+            self.horizons[key] = start
+        
+        if window == self.max_window:
+            for day in [day for day in buckets if day < start]:
+                del buckets[day]
+    
+    def top_terms(self, location, window=30):
+        # [(term, share of postings)] for the city, or for all cities when the
+        # city has fewer than min_city_postings postings in the window.
+        self.update()
+        today = self.today()
+        city = self.gazetteer.location_key(location) if location else self.ALL_CITIES
+        with self.lock:
+            if city not in self.days:
+                self.days[city] = {}
+            self.expire(city, window, today)
+            if self.postings[(city, window)] < self.min_city_postings:
+                city = self.ALL_CITIES
+                self.expire(city, window, today)
+            key = (city, window)
+            ranking = self.rankings.get(key)
+            if ranking is None:
+                total = self.postings[key]
+                ranking = [(term, count / total) for term, count in self.totals[key].most_common(self.RANKING_SIZE) if count > 0]
+                self.rankings[key] = ranking
+            return ranking
+    
+    def missing_skills(self, user_skills, location, window=30, n=5, min_share=0.02):
+        known = set()
+        for skill in SkillMatcher(user_skills).skills:
+            known.add(skill)
+            known.update(skill.split(' '))
+            for group in SkillMatcher.SKILL_ALIASES:
+                if skill in group:
+                    known.update(group)
+        
+        missing = []
+        for term, share in self.top_terms(location, window):
+            if term in known or share < min_share:
+                continue
+            missing.append((term, share))
+            if len(missing) == n:
+                break
+        return missing
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def try_acquire(self, tokens=1):
+        with self.lock:
+            self.refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+    
+    def acquire(self, tokens=1, stop_event=None):
+        while True:
+            wait_time = self.try_acquire(tokens)
+            if wait_time == 0.0:
+                return True
+            if stop_event is not None:
+                if stop_event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+
+
+class BulkIngester:
+    # Pages through every (provider, city, query) search in a fixed order and
+    # writes results into the agent's JobStore. The position is checkpointed
+    # after each page so a restarted crawl resumes where it stopped. A failed
+    # request leaves the position where it is and the crawl backs off
+    # exponentially before trying that page again.
+    def __init__(self, agent, cities, queries, checkpoint_path, max_pages=5, quota_share=0.5, burst=5,
+                 retry_base=60, retry_max=3600):
+        self.agent = agent
+        self.cities = list(cities)
+        self.queries = list(queries)
+        self.checkpoint_path = checkpoint_path
+        self.max_pages = max_pages
+        self.quota_share = quota_share
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.failures = 0
+        
+        self.tasks = [
+            (provider, city, query)
+            for provider in agent.provider_page_sizes
+            for city in self.cities
+            for query in self.queries
+        ]
+        
+        # Spread each provider's share of its monthly quota evenly over the month.
+        self.buckets = {}
+        for provider in agent.provider_page_sizes:
+            quota = agent.provider_cache.quotas.get(provider)
+            rate = quota * quota_share / (30 * 86400) if quota else 1.0
+            self.buckets[provider] = TokenBucket(rate, burst)
+        
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.checkpoint = self.load_checkpoint()
+    
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('tasks') == [list(task) for task in self.tasks]:
+                return checkpoint
+            print("Ingestion plan changed, starting a new crawl")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Could not read ingestion checkpoint: {e}")
+        
+        return {'tasks': [list(task) for task in self.tasks], 'task': 0, 'page': 1, 'rounds': 0, 'jobs_added': 0}
+    
+    def save_checkpoint(self):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def quota_left(self, provider):
+        used, quota = self.agent.provider_cache.quota_usage(provider)
+        return not quota or used < quota * self.quota_share
+    
+    def run_once(self):
+        # Crawls until every task is exhausted or stop() is called. Returns
+        # True when the round finished.
+        while self.checkpoint['task'] < len(self.tasks):
+            if self.stop_event.is_set():
+                return False
+            
+            provider, city, query = self.tasks[self.checkpoint['task']]
+            page = self.checkpoint['page']
+            page_size = self.agent.provider_page_sizes[provider]
+            
+            done_with_task = page > self.max_pages
+            if not done_with_task:
+                # A spent quota share pauses the crawl in place, like a failed
+                # request, so the position survives until quota frees up.
+                if not self.quota_left(provider):
+                    self.failures += 1
+                    print(f"Bulk ingestion paused at {provider} {city!r} page {page}: quota share used up")
+                    return False
+                if not self.buckets[provider].acquire(stop_event=self.stop_event):
+                    return False
+                
+                try:
+                    jobs = self.agent.providers[provider](city, query, page=page, results_per_page=page_size, raise_errors=True)
+                except ProviderError as e:
+                    self.failures += 1
+                    print(f"Bulk ingestion paused at {provider} {city!r} page {page}: {e}")
+                    return False
+                self.failures = 0
+                if jobs:
+                    before = self.agent.job_store.count()
+                    self.agent.store_fetched_jobs(jobs)
+                    self.checkpoint['jobs_added'] += self.agent.job_store.count() - before
+                
+                # A short page means the search has no more results.
+                done_with_task = len(jobs) < page_size
+            
+            if done_with_task:
+                self.checkpoint['task'] += 1
+                self.checkpoint['page'] = 1
+            else:
+                self.checkpoint['page'] = page + 1
+            self.save_checkpoint()
+        
+        self.checkpoint['task'] = 0
+        self.checkpoint['page'] = 1
+        self.checkpoint['rounds'] += 1
+        self.save_checkpoint()
+        return True
+    
+    def run_forever(self, round_interval=6 * 3600):
+        while not self.stop_event.is_set():
+            try:
+                finished = self.run_once()
+            except Exception as e:
+                print(f"Bulk ingestion error: {e}")
+                finished = False
+            if finished:
+                print(f"Bulk ingestion round {self.checkpoint['rounds']} complete, {self.checkpoint['jobs_added']} postings added so far")
+                delay = round_interval
+            else:
+                delay = min(self.retry_max, self.retry_base * 2 ** max(self.failures - 1, 0))
+            self.stop_event.wait(delay)
+    
+    def start(self, round_interval=6 * 3600):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run_forever, args=(round_interval,), name='ascend-bulk-ingest', daemon=True)
+        self.thread.start()
+    
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+class LocalFeedReader:
+    # Streams postings out of partner-board and government-portal exports
+    # (CSV or JSON lines, optionally gzipped) one record at a time, so a feed
+    # of any size is read in constant memory. Column names are mapped onto
+    # the job schema once per file.
+    EXTENSIONS = ('.csv', '.csv.gz', '.jsonl', '.jsonl.gz', '.ndjson', '.ndjson.gz')
+    FIELD_ALIASES = {
+        'title': ['title', 'job_title', 'jobtitle', 'position', 'designation', 'post', 'post_name', 'role'],
+        'company': ['company', 'company_name', 'employer', 'employer_name', 'organisation', 'organization'],
+        'location': ['location', 'job_location', 'city', 'district', 'place', 'work_location'],
+        'description': ['description', 'job_description', 'details', 'summary', 'responsibilities'],
+        'url': ['url', 'link', 'job_url', 'apply_url', 'apply_link'],
+        'salary': ['salary', 'pay', 'wage', 'wages', 'salary_range', 'ctc', 'stipend'],
+        'posted_date': ['posted_date', 'date_posted', 'posted_on', 'date', 'created', 'created_at'],
+        'source': ['source', 'portal', 'board']
+    }
+    
+    def __init__(self, source='Local'):
+        self.source = source
+        self.skipped = 0
+        # Long descriptions exceed the csv module's default 128 KB field limit.
+        csv.field_size_limit(max(csv.field_size_limit(), 16 * 1024 * 1024))
+    
+    @classmethod
+    def is_feed(cls, path):
+        return path.lower().endswith(cls.EXTENSIONS)
+    
+    @staticmethod
+    def open(path):
+        if path.lower().endswith('.gz'):
+            return gzip.open(path, 'rt', encoding='utf-8', errors='replace', newline='')
+        return open(path, 'r', encoding='utf-8', errors='replace', newline='')
+    
+    def field_map(self, keys):
+        normalized = {re.sub(r'[\s\-]+', '_', key.strip().lower()): key for key in keys if key}
+        fields = {}
+        for field, aliases in self.FIELD_ALIASES.items():
+            for alias in aliases:
+                if alias in normalized:
+                    fields[field] = normalized[alias]
+                    break
+        return fields
+    
+    def records(self, path):
+        with self.open(path) as f:
+            if '.csv' in path.lower():
+                yield from csv.DictReader(f)
+                return
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                if isinstance(record, dict):
+                    yield record
+                else:
+                    self.skipped += 1
+    
+    def jobs(self, path):
+        # Yields (record_number, job) for every record with a title; the
+        # record number lets an interrupted ingest skip what it already stored.
+        # JSON-lines records may vary in shape, so field maps are cached by key set.
+        field_maps = {}
+        for number, record in enumerate(self.records(path), 1):
+            keys = tuple(record.keys())
+            fields = field_maps.get(keys)
+            if fields is None:
+                fields = field_maps[keys] = self.field_map(keys)
+            job = {}
+            for field in JobStore.JOB_FIELDS:
+                value = record.get(fields[field]) if field in fields else None
+                job[field] = re.sub(r'\s+', ' ', str(value)).strip() if value not in (None, '') else ''
+            if not job['title']:
+                self.skipped += 1
+                continue
+            job['salary'] = job['salary'] or 'Not specified'
+            job['source'] = job['source'] or self.source
+            yield number, job
+
+
+class LocalFeedIngester:
+    # Watches a directory of local feed files and streams new or changed ones
+    # into the agent's corpus in batches. Progress is checkpointed per file
+    # after every batch, so a restart resumes mid-file and unchanged files are
+    # never read twice.
+    def __init__(self, agent, feed_dir, checkpoint_path, batch_size=1000):
+        self.agent = agent
+        self.feed_dir = feed_dir
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.reader = LocalFeedReader()
+        
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.checkpoint = self.load_checkpoint()
+    
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Could not read local feed checkpoint: {e}")
+        return {'files': {}, 'jobs_added': 0}
+    
+    def save_checkpoint(self):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def feed_paths(self):
+        if not os.path.isdir(self.feed_dir):
+            return []
+        return sorted(
+            os.path.join(self.feed_dir, name) for name in os.listdir(self.feed_dir)
+            if LocalFeedReader.is_feed(name)
+        )
+    
+    def ingest_file(self, path):
+        # Returns False if stop() interrupted the file.
+        stat = os.stat(path)
+        version = [stat.st_size, stat.st_mtime]
+        state = self.checkpoint['files'].get(path)
+        if state is None or state['version'] != version:
+            state = {'version': version, 'records': 0, 'done': False}
+            self.checkpoint['files'][path] = state
+        if state['done']:
+            return True
+        
+        resume_after = state['records']
+        batch = []
+        number = resume_after
+        for number, job in self.reader.jobs(path):
+            if number <= resume_after:
+                continue
+            batch.append(job)
+            if len(batch) >= self.batch_size:
+                self.store_batch(batch, state, number)
+                batch = []
+                if self.stop_event.is_set():
+                    return False
+        
+        if batch:
+            self.store_batch(batch, state, number)
+        state['records'] = max(state['records'], number)
+        state['done'] = True
+        self.save_checkpoint()
+        return True
+    
+    def store_batch(self, batch, state, number):
+        before = self.agent.job_store.count()
+        self.agent.store_fetched_jobs(batch)
+        self.checkpoint['jobs_added'] += self.agent.job_store.count() - before
+        state['records'] = number
+        self.save_checkpoint()
+    
+    def run_once(self):
+        with self.lock:
+            for path in self.feed_paths():
+                if self.stop_event.is_set():
+                    return False
+                try:
+                    if not self.ingest_file(path):
+                        return False
+                except Exception as e:
+                    print(f"Error ingesting local feed {path}: {e}")
+            return True
+    
+    def run_forever(self, scan_interval=600):
+        while not self.stop_event.is_set():
+            self.run_once()
+            self.stop_event.wait(scan_interval)
+    
+    def start(self, scan_interval=600):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run_forever, args=(scan_interval,), name='ascend-local-feeds', daemon=True)
+        self.thread.start()
+    
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive failures and rejects calls for
+    # reset_timeout seconds. After that a single trial call is let through
+    # (half-open); its outcome closes the breaker or opens it again.
+    def __init__(self, failure_threshold=3, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+    
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return 'open'
+            return 'half_open'
+    
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_running:
+                return False
+            self.trial_running = True
+            return True
+    
+    def cancel(self):
+        # Called when an allowed call was never made.
+        with self.lock:
+            self.trial_running = False
+    
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+    
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ProviderError(Exception):
+    # A provider request that failed; raised by the fetch_from_* functions
+    # when called with raise_errors=True.
+    pass
+
+
+class ProviderUnavailable(ProviderError):
+    # Raised without sending a request while the provider's breaker is open.
+    pass
+
+
+class ProviderResilience:
+    # Wraps single provider HTTP requests with:
+    # - retries with full-jitter exponential backoff on retryable statuses and
+    #   connection errors, within a per-call time budget;
+    # - a hedged duplicate request once the first has taken longer than the
+    #   provider's recent p95 latency (whichever answers first wins);
+    # - a circuit breaker per provider, so a provider that keeps failing is
+    #   skipped instantly until its cooldown ends.
+    # Every request actually sent (first attempts, retries and hedges) is
+    # recorded against the provider quota, and hedging stops once the quota is
+    # used up. Calls rejected by an open breaker are not charged.
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    def __init__(self, quota=None, tracer=None, max_attempts=3, backoff_base=0.25, backoff_max=2.0,
+                 hedge_min_samples=20, hedge_min_delay=0.05, latency_window=200,
+                 breaker_threshold=3, breaker_reset=30.0, max_hedges=16):
+        self.quota = quota
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.latency_window = latency_window
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        
+        self.breakers = {}
+        self.latencies = {}
+        self.rng = random.Random()
+        self.lock = threading.Lock()
+        self.hedge_pool = ThreadPoolExecutor(max_workers=max_hedges, thread_name_prefix='ascend-hedge')
+    
+    def breaker(self, provider):
+        with self.lock:
+            breaker = self.breakers.get(provider)
+            if breaker is None:
+                breaker = self.breakers[provider] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return breaker
+    
+    def record_latency(self, provider, seconds):
+        with self.lock:
+            samples = self.latencies.get(provider)
+            if samples is None:
+                samples = self.latencies[provider] = deque(maxlen=self.latency_window)
+            samples.append(seconds)
+    
+    def hedge_delay(self, provider):
+        # None until enough latencies have been seen to estimate the p95.
+        with self.lock:
+            samples = sorted(self.latencies.get(provider, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, samples[int(0.95 * (len(samples) - 1))])
+    
+    def record_request(self, provider):
+        if self.quota is not None:
+            self.quota.record_call(provider)
+    
+    def retryable(self, response):
+        return response.status_code in self.RETRY_STATUSES
+    
+    def call(self, provider, request, budget=None):
+        # request() performs one HTTP request and returns the response. Returns
+        # the first non-retryable response, or the last response once retries
+        # are exhausted; raises ProviderUnavailable while the breaker is open.
+        breaker = self.breaker(provider)
+        if not breaker.allow():
+            self.tracer.count('provider.breaker_open', provider=provider)
+            raise ProviderUnavailable(f"{provider} is failing, skipped until its circuit breaker resets")
+        
+        started = time.monotonic()
+        response = None
+        error = None
+        try:
+            for attempt in range(self.max_attempts):
+                if attempt:
+                    delay = self.rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                    retry_after = response.headers.get('Retry-After') if response is not None else None
+                    if retry_after and retry_after.isdigit():
+                        delay = max(delay, float(retry_after))
+                    if budget is not None and time.monotonic() - started + delay > budget:
+                        break
+                    self.tracer.count('provider.retries', provider=provider)
+                    time.sleep(delay)
+                
+                self.record_request(provider)
+                try:
+                    response = self.hedged(provider, request)
+                    error = None
+                except requests.RequestException as e:
+                    response = None
+                    error = e
+                    continue
+                
+                if not self.retryable(response):
+                    breaker.record_success()
+                    return response
+        except BaseException:
+            # Anything unexpected still ends a half-open trial, or the breaker
+            # would reject every later call.
+            breaker.record_failure()
+            raise
+        
+        breaker.record_failure()
+        if response is None and error is not None:
+            raise error
+        return response
+    
+    def timed(self, provider, request):
+        started = time.perf_counter()
+        response = request()
+        if not self.retryable(response):
+            self.record_latency(provider, time.perf_counter() - started)
+        return response
+    
+    def hedged(self, provider, request):
+        delay = self.hedge_delay(provider)
+        if delay is None or (self.quota is not None and self.quota.quota_exhausted(provider)):
+            return self.timed(provider, request)
+        
+        first = self.hedge_pool.submit(self.timed, provider, request)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        
+        self.tracer.count('provider.hedged', provider=provider)
+        self.record_request(provider)
+        second = self.hedge_pool.submit(self.timed, provider, request)
+        
+        # The first usable answer wins; otherwise report whichever came last.
+        result = None
+        error = None
+        for future in as_completed([first, second]):
+            try:
+                result = future.result()
+            except requests.RequestException as e:
+                error = e
+                continue
+            if not self.retryable(result):
+                if future is second:
+                    self.tracer.count('provider.hedge_wins', provider=provider)
+                return result
+        if result is None:
+            raise error
+        return result
+    
+    def close(self):
+        self.hedge_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class GeminiClient:
+    # Shared Gemini access for every search on an agent. GenerativeModel objects
+    # are built once per model name, the last model that answered is tried
+    # first, and a circuit breaker per model skips ones that keep failing.
+    # Calls are bounded by a concurrency semaphore plus per-minute and per-day
+    # request budgets; once a budget is spent callers get None and fall back to
+    # the offline recommendations. The daily count lives in SQLite at
+    # usage_path, so every process sharing a data directory shares the budget.
+    MODEL_NAMES = ['gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro', 'models/gemini-pro']
+    SYSTEM_PROMPT = "You are an expert career coach and resume advisor helping job seekers improve their prospects. Provide practical, actionable advice."
+    
+    def __init__(self, get_genai, tracer=None, max_concurrency=4, requests_per_minute=15, requests_per_day=1500, max_wait=5.0,
+                 usage_path=':memory:'):
+        self.get_genai = get_genai
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.requests_per_day = requests_per_day
+        self.max_wait = max_wait
+        
+        self.models = {}
+        self.preferred = None
+        self.breakers = {name: CircuitBreaker(failure_threshold=2, reset_timeout=300) for name in self.MODEL_NAMES}
+        self.lock = threading.Lock()
+        
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.minute_bucket = TokenBucket(requests_per_minute / 60.0, requests_per_minute)
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(usage_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS gemini_usage (
+                day TEXT PRIMARY KEY,
+                requests INTEGER NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='ascend-gemini')
+    
+    def get_model(self, model_name):
+        with self.lock:
+            model = self.models.get(model_name)
+            if model is None:
+                model = self.get_genai().GenerativeModel(model_name)
+                self.models[model_name] = model
+            return model
+    
+    def model_order(self):
+        preferred = self.preferred
+        names = [preferred] if preferred else []
+        names.extend(name for name in self.MODEL_NAMES if name != preferred)
+        return names
+    
+    def day_budget_left(self, charge=False):
+        # Charging is a single conditional upsert, so processes racing for the
+        # last request cannot both get it.
+        today = time.strftime('%Y-%m-%d', time.gmtime())
+        with self.db_lock:
+            if charge:
+                cursor = self.conn.execute(
+                    "INSERT INTO gemini_usage (day, requests) VALUES (?, 1) "
+                    "ON CONFLICT (day) DO UPDATE SET requests = requests + 1 WHERE requests < ?",
+                    (today, self.requests_per_day)
+                )
+                self.conn.commit()
+                left = cursor.rowcount > 0 and self.requests_per_day > 0
+            else:
+                row = self.conn.execute("SELECT requests FROM gemini_usage WHERE day = ?", (today,)).fetchone()
+                left = (row[0] if row else 0) < self.requests_per_day
+        if not left:
+            self.tracer.count('gemini.quota_exhausted', window='day')
+        return left
+    
+    def acquire_request(self):
+        # The daily budget is only charged once the per-minute bucket has
+        # admitted the request, so rejected requests cost nothing.
+        if not self.day_budget_left():
+            return False
+        
+        wait_time = self.minute_bucket.try_acquire()
+        if wait_time > self.max_wait:
+            self.tracer.count('gemini.quota_exhausted', window='minute')
+            return False
+        if wait_time:
+            time.sleep(wait_time)
+            self.minute_bucket.acquire()
+        return self.day_budget_left(charge=True)
+    
+    def stream(self, prompt, chunked=True):
+        # Yields response text as it arrives. A model that fails before its
+        # first chunk is skipped for the next one; a failure mid-answer is
+        # raised since the caller has already shown part of it.
+        full_prompt = f"{self.SYSTEM_PROMPT}\n\n{prompt}"
+        with self.semaphore:
+            for model_name in self.model_order():
+                breaker = self.breakers[model_name]
+                if not breaker.allow():
+                    self.tracer.count('gemini.breaker_skips', model=model_name)
+                    continue
+                if not self.acquire_request():
+                    breaker.cancel()
+                    return
+                
+                with self.tracer.span('gemini.attempt', model=model_name, prompt_chars=len(prompt), stream=chunked) as span:
+                    started = time.perf_counter()
+                    emitted = False
+                    try:
+                        model = self.get_model(model_name)
+                        if chunked:
+                            chunks = (chunk.text for chunk in model.generate_content(full_prompt, stream=True))
+                        else:
+                            chunks = [model.generate_content(full_prompt).text]
+                        for text in chunks:
+                            if not text:
+                                continue
+                            if not emitted:
+                                emitted = True
+                                span.set('ttft_ms', round((time.perf_counter() - started) * 1000, 1))
+                            yield text
+                    except Exception as model_error:
+                        span.set('error', str(model_error))
+                        self.tracer.count('gemini.model_errors', model=model_name)
+                        breaker.record_failure()
+                        print(f"Model {model_name} failed: {str(model_error)}")
+                        if emitted:
+                            raise
+                        continue
+                    except BaseException:
+                        # The consumer closed the stream or was interrupted;
+                        # that says nothing about the model, but a half-open
+                        # trial must still end or the model stays blocked.
+                        breaker.cancel()
+                        raise
+                
+                breaker.record_success()
+                self.preferred = model_name
+                return
+    
+    def generate(self, prompt):
+        text = "".join(self.stream(prompt, chunked=False))
+        return text or None
+    
+    def generate_many(self, prompts):
+        # Runs several users' prompts at once; the semaphore still bounds how
+        # many reach Gemini concurrently.
+        return list(self.executor.map(self.generate, prompts))
+    
+    async def generate_async(self, prompt):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.generate, prompt)
+    
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self.db_lock:
+            self.conn.close()
+
+
+class PromptBuilder:
+    # Builds the career-advice prompt within a token budget. Each job always
+    # gets a header line; the rest of the budget goes to description sentences
+    # ranked by what the advice depends on (the user's skills, known skills the
+    # user lacks, requirements, salary), weighted toward higher-ranked jobs.
+    # Sentences with none of those still fill any budget left over. Sentences
+    # repeated across jobs are listed once. Tokens are estimated at four
+    # characters each.
+    INSTRUCTIONS = """Respond with four sections:
+1. RESUME OPTIMIZATION TIPS: keywords to emphasize, experience to highlight, skills-section priorities, formatting.
+2. APPLICATION STRATEGY: which jobs to prioritize by match score, tailoring each application, cover-letter points, interview preparation.
+3. SKILL DEVELOPMENT PLAN: missing skills frequent in these jobs, learning order, specific courses and platforms, timeline.
+4. INDUSTRY INSIGHTS: market trends for these roles, salary negotiation, growth opportunities.
+Keep it practical, actionable and encouraging, focused on immediate next steps."""
+    
+    REQUIREMENT_PATTERN = re.compile(
+        r'\b(required|requirements?|must|should|experience|years?|yrs|qualifications?|degree|graduate|'
+        r'proficien\w*|knowledge|skills?|certifi\w*|familiar\w*|hands-on|expertise)\b'
+    )
+    SALARY_PATTERN = re.compile(r'(₹|\binr\b|\blpa\b|\bctc\b|\bsalary\b|\blakhs?\b|\bper (month|annum)\b|\d+\s*k\b)')
+    SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])\s+|\n+|\s*[•·▪]\s*')
+    
+    def __init__(self, token_budget=700):
+        self.token_budget = token_budget
+    
+    @staticmethod
+    def estimate_tokens(text):
+        return (len(text) + 3) // 4
+    
+    def sentence_score(self, sentence, matcher, known_skills):
+        text = sentence.lower()
+        score = 0.0
+        if matcher.pattern is not None:
+            score += 2.0 * len(matcher.matched_skills(text))
+        # Skills the user lacks are what the skill-development advice is about.
+        lexicon = SkillMatcher.lexicon()
+        score += 1.5 * len(lexicon.matched_skills(text) - known_skills)
+        if self.REQUIREMENT_PATTERN.search(text):
+            score += 1.5
+        if self.SALARY_PATTERN.search(text):
+            score += 1.5
+        # Very short fragments rarely carry a requirement.
+        if len(text) < 25:
+            score -= 1.0
+        return score
+    
+    def build(self, user_skills, job_analysis, experience_level):
+        matcher = SkillMatcher(user_skills)
+        known_skills = SkillMatcher.lexicon().matched_skills(", ".join(matcher.skills))
+        
+        header = f"USER PROFILE:\n- Current Skills: {user_skills}\n- Experience Level: {experience_level}\n\nTOP JOB OPPORTUNITIES:"
+        job_headers = []
+        for job in job_analysis:
+            line = f"{job['position']}. {job['title']} at {job['company']} (match {job['match_score']:.0%}"
+            if job.get('salary') and job['salary'] != 'Not specified':
+                line += f", salary {job['salary']}"
+            job_headers.append(line + ")")
+        
+        # Sentences seen in more than one job are hoisted into a shared list.
+        job_sentences = []
+        occurrences = {}
+        for job in job_analysis:
+            sentences = []
+            seen = set()
+            for sentence in self.SENTENCE_SPLIT.split(job['description']):
+                sentence = re.sub(r'\s+', ' ', sentence).strip()
+                key = sentence.lower()
+                if len(sentence) < 3 or key in seen:
+                    continue
+                seen.add(key)
+                sentences.append(sentence)
+                occurrences[key] = occurrences.get(key, 0) + 1
+            job_sentences.append(sentences)
+        
+        candidates = []
+        shared = {}
+        for rank, sentences in enumerate(job_sentences):
+            weight = 1.0 / (1.0 + 0.25 * rank)
+            for order, sentence in enumerate(sentences):
+                key = sentence.lower()
+                score = self.sentence_score(sentence, matcher, known_skills)
+                if occurrences[key] > 1:
+                    if key not in shared:
+                        shared[key] = len(shared)
+                        candidates.append((score * occurrences[key], -1, shared[key], sentence))
+                    continue
+                candidates.append((score * weight, rank, order, sentence))
+        
+        used = self.estimate_tokens(header) + self.estimate_tokens(self.INSTRUCTIONS)
+        used += sum(self.estimate_tokens(line) + 1 for line in job_headers)
+        
+        chosen = {}
+        # Zero and negative scores sort last, so they only use spare budget.
+        for score, rank, order, sentence in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+            cost = self.estimate_tokens(sentence) + 2
+            if used + cost > self.token_budget:
+                continue
+            used += cost
+            chosen.setdefault(rank, []).append((order, sentence))
+        
+        lines = [header]
+        if chosen.get(-1):
+            lines.append("Common to several roles: " + " ".join(s for _, s in sorted(chosen[-1])))
+        for rank, line in enumerate(job_headers):
+            lines.append(line)
+            for order, sentence in sorted(chosen.get(rank, [])):
+                lines.append(f"   - {sentence}")
+        lines.append("")
+        lines.append(self.INSTRUCTIONS)
+        return "\n".join(lines)
+
+
+class RecommendationCache:
+    # Caches Gemini career advice by a fingerprint of (experience level,
+    # canonical skill set, top-job set). Exact fingerprints are looked up in
+    # memory and then SQLite. Otherwise an entry for the same experience level
+    # whose skills and jobs overlap enough (Jaccard) is reused, since
+    # near-identical profiles get near-identical advice.
+    def __init__(self, db_path, ttl=7 * 86400, max_entries=1024, skill_threshold=0.8, job_threshold=0.6, tracer=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.skill_threshold = skill_threshold
+        self.job_threshold = job_threshold
+        self.tracer = tracer if tracer is not None else Tracer()
+        
+        self.canonical_skills = {}
+        for group in SkillMatcher.SKILL_ALIASES:
+            for name in group:
+                self.canonical_skills[name] = group[0]
+        
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS recommendations (
+                cache_key TEXT PRIMARY KEY,
+                experience_level TEXT NOT NULL,
+                skills TEXT NOT NULL,
+                jobs TEXT NOT NULL,
+                recommendations TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+        
+        # Warm the memory tier so similar profiles match across restarts.
+        rows = self.conn.execute(
+            "SELECT cache_key, experience_level, skills, jobs, recommendations, created_at FROM recommendations "
+            "WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+            (time.time() - self.ttl, self.max_entries)
+        ).fetchall()
+        for key, level, skills, jobs, text, created_at in reversed(rows):
+            self.memory[key] = (text, created_at, level, frozenset(json.loads(skills)), frozenset(json.loads(jobs)))
+    
+    def fingerprint(self, user_skills, job_analysis, experience_level):
+        skills = set()
+        for skill in user_skills.split(','):
+            skill = SkillMatcher.normalize(skill)
+            if skill:
+                skills.add(self.canonical_skills.get(skill, skill))
+        
+        jobs = set()
+        for job in job_analysis:
+            jobs.add(f"{SkillMatcher.normalize(job['title'])}|{SkillMatcher.normalize(job['company'])}")
+        
+        level = SkillMatcher.normalize(experience_level)
+        key = hashlib.sha1(f"{level}\n{','.join(sorted(skills))}\n{chr(10).join(sorted(jobs))}".encode('utf-8')).hexdigest()
+        return key, level, frozenset(skills), frozenset(jobs)
+    
+    @staticmethod
+    def jaccard(a, b):
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+    
+    def get(self, user_skills, job_analysis, experience_level):
+        key, level, skills, jobs = self.fingerprint(user_skills, job_analysis, experience_level)
+        cutoff = time.time() - self.ttl
+        
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and entry[1] >= cutoff:
+                self.memory.move_to_end(key)
+                self.exact_hits += 1
+                self.tracer.count('recommendation_cache.hit', tier='exact')
+                return entry[0]
+        
+        if entry is None:
+            with self.db_lock:
+                row = self.conn.execute(
+                    "SELECT recommendations, created_at FROM recommendations WHERE cache_key = ? AND created_at >= ?",
+                    (key, cutoff)
+                ).fetchone()
+            if row is not None:
+                self.remember(key, (row[0], row[1], level, skills, jobs))
+                self.exact_hits += 1
+                self.tracer.count('recommendation_cache.hit', tier='exact')
+                return row[0]
+        
+        best_key = None
+        best_score = 0.0
+        with self.lock:
+            for other_key, (text, created_at, other_level, other_skills, other_jobs) in self.memory.items():
+                if other_level != level or created_at < cutoff:
+                    continue
+                skill_score = self.jaccard(skills, other_skills)
+                job_score = self.jaccard(jobs, other_jobs)
+                if skill_score >= self.skill_threshold and job_score >= self.job_threshold and skill_score + job_score > best_score:
+                    best_key = other_key
+                    best_score = skill_score + job_score
+            
+            if best_key is not None:
+                self.memory.move_to_end(best_key)
+                self.similar_hits += 1
+                self.tracer.count('recommendation_cache.hit', tier='similar')
+                return self.memory[best_key][0]
+        
+        self.misses += 1
+        self.tracer.count('recommendation_cache.miss')
+        return None
+    
+    def remember(self, key, entry):
+        with self.lock:
+            self.memory[key] = entry
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+    
+    def put(self, user_skills, job_analysis, experience_level, recommendations):
+        key, level, skills, jobs = self.fingerprint(user_skills, job_analysis, experience_level)
+        created_at = time.time()
+        self.remember(key, (recommendations, created_at, level, skills, jobs))
+        
+        with self.db_lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO recommendations (cache_key, experience_level, skills, jobs, recommendations, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, level, json.dumps(sorted(skills)), json.dumps(sorted(jobs)), recommendations, created_at)
+            )
+            self.conn.execute("DELETE FROM recommendations WHERE created_at < ?", (created_at - self.ttl,))
+            self.conn.commit()
+    
+    def close(self):
+        with self.db_lock:
+            self.conn.close()
+
+
+# Result of AscendAIAgent.batch_match: one row per user profile, k columns
+# ordered best first. Unused slots have job id -1 and score -inf.
+MatchResult = namedtuple('MatchResult', ['job_ids', 'scores', 'skill_relevance'])
+
+
+# One step of AscendAIAgent.stream_opportunities: the ranking so far, which
+# providers have answered, and whether this is the last update.
+SearchUpdate = namedtuple('SearchUpdate', ['opportunities', 'completed_providers', 'pending_providers', 'final'])
+
+
+def top_k_indices(scores, k):
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int64)
+    
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
 class AscendAIAgent:
-    def __init__(self):
+    def __init__(self, data_dir="ascend_data", tracer=None, provider_workers=8):
+        # Tracing is off unless a tracer with exporters is passed in or
+        # ASCEND_TRACE_FILE names a JSON-lines file to append spans to.
+        self.tracer = tracer if tracer is not None else Tracer()
+        if os.environ.get('ASCEND_TRACE_FILE'):
+            self.tracer.add_exporter(JsonLinesExporter(os.environ['ASCEND_TRACE_FILE']))
+        
         self.job_data = []
-        self.vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+        self.vectorizer = None
         self.job_vectors = None
         
         self.GEMINI_API_KEY = "YOUR_GEMINI_API_KEY"
@@ -24,11 +2886,169 @@ class AscendAIAgent:
         self.ADZUNA_APP_KEY = "YOUR_ADZUNA_APP_KEY"
         self.RAPIDAPI_KEY = "YOUR_RAPIDAPI_KEY"
         
+        # Endpoints can be pointed at local stand-ins (see benchmark.py).
+        self.ADZUNA_BASE_URL = "https://api.adzuna.com/v1/api/jobs/in/search"
+        self.JSEARCH_BASE_URL = "https://jsearch.p.rapidapi.com/search"
+        self.GEMINI_API_ENDPOINT = None
+        self.gemini = None
+        self.gemini_lock = threading.Lock()
+        
+        # Every fetched posting is kept in a local corpus so searches rank
+        # against everything we have seen, not just the latest fetch.
+        self.DATA_DIR = data_dir
+        self.CORPUS_MAX_AGE_DAYS = 30
+        os.makedirs(self.DATA_DIR, exist_ok=True)
+        
+        # Gemini's free tier allows 15 requests a minute and 1,500 a day.
+        self.GEMINI_MAX_CONCURRENCY = 4
+        self.gemini_client = GeminiClient(self.get_gemini, tracer=self.tracer, max_concurrency=self.GEMINI_MAX_CONCURRENCY, requests_per_minute=15, requests_per_day=1500,
+                                          usage_path=os.path.join(self.DATA_DIR, 'gemini_usage.db'))
+        self.gazetteer = Gazetteer()
+        self.job_store = JobStore(os.path.join(self.DATA_DIR, 'jobs.db'), gazetteer=self.gazetteer)
+        self.job_index = JobIndex(self.job_store, os.path.join(self.DATA_DIR, 'job_index'))
+        self.job_table = JobTable(self.job_store)
+        self.skill_demand = SkillDemand(self.job_table)
+        self.RETRIEVAL_MIN_CANDIDATES = 2000
+        self.RETRIEVAL_POOL = 300
+        # Searches for a known city also cover postings in cities this close.
+        self.SEARCH_RADIUS_KM = 50
+        
+        # Gemini advice is reused for a week for the same or a near-identical
+        # profile and job set.
+        self.recommendation_cache = RecommendationCache(os.path.join(self.DATA_DIR, 'recommendations.db'), tracer=self.tracer)
+        # Recommendation prompts are compacted to about this many input tokens.
+        self.GEMINI_PROMPT_TOKENS = 700
+        self.prompt_builder = PromptBuilder(self.GEMINI_PROMPT_TOKENS)
+        
+        # Provider fan-out settings: every provider runs concurrently and the
+        # whole search is bounded by SEARCH_DEADLINE seconds.
+        self.PROVIDER_TIMEOUT = 10
+        self.SEARCH_DEADLINE = 12
+        self.HTTP_POOL_SIZE = 10
+        
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.provider_pool = ThreadPoolExecutor(max_workers=provider_workers, thread_name_prefix='ascend-provider')
+        
+        # Adzuna and JSearch free tiers are 1,000 and 500 requests a month, so
+        # their responses are cached for an hour and served stale for up to a
+        # day while a background refresh runs.
+        self.provider_cache = ProviderCache(os.path.join(self.DATA_DIR, 'provider_cache.db'), executor=self.provider_pool, tracer=self.tracer, gazetteer=self.gazetteer)
+        # Provider requests are retried, hedged and circuit-broken; see
+        # ProviderResilience.
+        self.provider_resilience = ProviderResilience(quota=self.provider_cache, tracer=self.tracer)
+        
+        self.providers = {}
+        self.provider_page_sizes = {}
+        self.register_provider('Adzuna', self.fetch_from_adzuna, cache_ttl=3600, stale_ttl=86400, monthly_quota=1000, page_size=50)
+        self.register_provider('JSearch', self.fetch_from_jsearch, cache_ttl=3600, stale_ttl=86400, monthly_quota=500, page_size=10)
+        self.register_provider('Local', self.scrape_local_jobs)
+        
+        # Background bulk ingestion pages through these searches so interactive
+        # queries rank a large local corpus. It may spend at most
+        # INGEST_QUOTA_SHARE of each provider's monthly quota.
+        self.INGEST_CITIES = ['Bangalore', 'Mumbai', 'Delhi', 'Hyderabad', 'Chennai', 'Pune', 'Kolkata']
+        self.INGEST_QUERIES = ['python', 'java', 'data analyst', 'sales', 'marketing', 'accountant', 'customer support']
+        self.INGEST_MAX_PAGES = 5
+        self.INGEST_QUOTA_SHARE = 0.5
+        
+        # CSV / JSON-lines exports from partner boards and government portals
+        # (optionally .gz) dropped in LOCAL_FEED_DIR are streamed into the
+        # corpus in the background once the Local provider is first used.
+        self.LOCAL_FEED_DIR = os.path.join(self.DATA_DIR, 'feeds')
+        self.LOCAL_FEED_BATCH = 1000
+        self.local_feed_ingester = LocalFeedIngester(
+            self,
+            self.LOCAL_FEED_DIR,
+            os.path.join(self.DATA_DIR, 'local_feeds_checkpoint.json'),
+            batch_size=self.LOCAL_FEED_BATCH
+        )
+        
+    def register_provider(self, name, fetch_function, cache_ttl=None, stale_ttl=0, monthly_quota=None, page_size=None):
+        # Providers with a page_size accept page=, results_per_page= and
+        # raise_errors= (raise ProviderError instead of returning []) and can be
+        # crawled by BulkIngester.
+        self.providers[name] = fetch_function
+        if cache_ttl:
+            self.provider_cache.configure(name, cache_ttl, stale_ttl, monthly_quota)
+        if page_size:
+            self.provider_page_sizes[name] = page_size
+    
+    def call_provider(self, name, location, skills_query):
+        with self.tracer.span('provider.fetch', provider=name, location=location) as span:
+            jobs = self.provider_cache.get(name, location, skills_query, self.providers[name])
+            span.set('jobs', len(jobs) if jobs else 0)
+            return jobs
+    
+    def get_session(self, provider_name):
+        with self.sessions_lock:
+            session = self.sessions.get(provider_name)
+            if session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.HTTP_POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self.sessions[provider_name] = session
+            return session
+    
+    def create_bulk_ingester(self):
+        return BulkIngester(
+            self,
+            self.INGEST_CITIES,
+            self.INGEST_QUERIES,
+            os.path.join(self.DATA_DIR, 'ingest_checkpoint.json'),
+            max_pages=self.INGEST_MAX_PAGES,
+            quota_share=self.INGEST_QUOTA_SHARE
+        )
+    
+    def close(self):
+        self.local_feed_ingester.stop(timeout=30)
+        self.provider_pool.shutdown(wait=False, cancel_futures=True)
+        self.provider_resilience.close()
+        self.gemini_client.close()
+        self.recommendation_cache.close()
+        with self.sessions_lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+        self.provider_cache.close()
+        self.job_index.close()
+        self.job_store.close()
+        self.tracer.close()
+        
+    def prewarm(self):
+        # Loads everything a search touches. Call it in a parent process before
+        # forking workers so they start with imports done and the saved index
+        # mapped.
+        sklearn_text.TfidfVectorizer
+        sklearn_pairwise.cosine_similarity
+        requests.Session
+        self.job_index.ensure_loaded()
+        self.job_table.ensure_loaded()
+        self.skill_demand.update()
+        with self.job_store.lock:
+            self.job_store.load_signatures()
+    
+    def get_gemini(self):
+        # google.generativeai is imported and configured once per agent.
+        with self.gemini_lock:
+            if self.gemini is None:
+                import google.generativeai as genai
+                
+                if self.GEMINI_API_ENDPOINT:
+                    genai.configure(
+                        api_key=self.GEMINI_API_KEY,
+                        transport='rest',
+                        client_options={'api_endpoint': self.GEMINI_API_ENDPOINT}
+                    )
+                else:
+                    genai.configure(api_key=self.GEMINI_API_KEY)
+                self.gemini = genai
+            return self.gemini
+    
     def test_gemini_connection(self):
         try:
-            import google.generativeai as genai
-            
-            genai.configure(api_key=self.GEMINI_API_KEY)
+            genai = self.get_gemini()
             
             print("Testing Gemini API connection...")
             
@@ -67,30 +3087,78 @@ class AscendAIAgent:
     def fetch_real_time_jobs(self, location, skills_query=""):
         print(f"Searching for jobs in {location}...")
         
-        jobs = []
-        
-        jobs.extend(self.fetch_from_adzuna(location, skills_query))
-        jobs.extend(self.fetch_from_jsearch(location, skills_query))
-        jobs.extend(self.scrape_local_jobs(location, skills_query))
-        
-        self.job_data = jobs
+        with self.tracer.span('search.fetch', location=location) as span:
+            jobs = self.fetch_from_providers(location, skills_query)
+            self.job_data = self.store_fetched_jobs(jobs)
+            span.set('jobs', len(self.job_data))
         print(f"Found {len(self.job_data)} opportunities!")
         return self.job_data
     
-    def fetch_from_adzuna(self, location, skills_query):
+    def store_fetched_jobs(self, jobs):
+        # Near-duplicates across providers collapse into one stored record, so
+        # the returned list is reloaded to carry the merged sources and URLs.
+        stored_jobs, new_jobs = self.job_store.add_jobs(jobs)
+        self.job_index.add_jobs(new_jobs)
+        new_ids = set(job['id'] for job in new_jobs)
+        self.job_table.refresh(job['id'] for job in stored_jobs if job['id'] not in new_ids)
+        records = self.job_table.records(sorted(job['id'] for job in stored_jobs))
+        self.skill_demand.update()
+        return records
+    
+    def submit_providers(self, location, skills_query):
+        futures = {}
+        for name in self.providers:
+            future = self.provider_pool.submit(self.call_provider, name, location, skills_query)
+            futures[future] = name
+        return futures
+    
+    def fetch_from_providers(self, location, skills_query, deadline=None):
+        deadline = self.SEARCH_DEADLINE if deadline is None else deadline
+        
+        futures = self.submit_providers(location, skills_query)
+        
+        done, not_done = wait(futures, timeout=deadline)
+        
+        # Keep provider order stable so rankings with tied scores are reproducible.
+        results = {}
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result() or []
+            except Exception as e:
+                self.tracer.count('provider.errors', provider=name, error=type(e).__name__)
+                print(f"Error fetching from {name}: {e}")
+        
+        for future in not_done:
+            future.cancel()
+            self.tracer.count('provider.deadline_missed', provider=futures[future])
+            print(f"{futures[future]} missed the {deadline}s search deadline, returning partial results")
+        
+        jobs = []
+        for name in self.providers:
+            jobs.extend(results.get(name, []))
+        
+        return jobs
+    
+    def fetch_from_adzuna(self, location, skills_query, page=1, results_per_page=10, raise_errors=False):
         try:
-            url = f"https://api.adzuna.com/v1/api/jobs/in/search/1"
+            url = f"{self.ADZUNA_BASE_URL}/{page}"
             params = {
                 'app_id': self.ADZUNA_APP_ID,
                 'app_key': self.ADZUNA_APP_KEY,
-                'results_per_page': 10,
+                'results_per_page': results_per_page,
                 'what': skills_query,
                 'where': location,
                 'sort_by': 'date',
                 'max_days_old': 7
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            session = self.get_session('Adzuna')
+            response = self.provider_resilience.call(
+                'Adzuna',
+                lambda: session.get(url, params=params, timeout=self.PROVIDER_TIMEOUT),
+                budget=self.PROVIDER_TIMEOUT
+            )
             
             if response.status_code == 200:
                 data = response.json()
@@ -111,19 +3179,31 @@ class AscendAIAgent:
                 
                 return jobs
             
+            self.tracer.count('provider.errors', provider='Adzuna', status=response.status_code)
+            if raise_errors:
+                raise ProviderError(f"Adzuna returned HTTP {response.status_code}")
+            
         except Exception as e:
+            if raise_errors and isinstance(e, ProviderError):
+                raise
+            self.tracer.count('provider.errors', provider='Adzuna', error=type(e).__name__)
             print(f"Error fetching from Adzuna: {e}")
+            if raise_errors:
+                raise ProviderError(f"Adzuna request failed: {e}") from e
         
         return []
     
-    def fetch_from_jsearch(self, location, skills_query):
+    def fetch_from_jsearch(self, location, skills_query, page=1, results_per_page=10, raise_errors=False):
         try:
-            url = "https://jsearch.p.rapidapi.com/search"
+            url = self.JSEARCH_BASE_URL
             
+            # JSearch always returns 10 results per page; larger page sizes are
+            # served as several pages in one (more expensive) request.
+            num_pages = max(1, -(-results_per_page // 10))
             querystring = {
                 "query": f"{skills_query} in {location}",
-                "page": "1",
-                "num_pages": "1",
+                "page": str((page - 1) * num_pages + 1),
+                "num_pages": str(num_pages),
                 "date_posted": "week"
             }
             
@@ -132,7 +3212,12 @@ class AscendAIAgent:
                 "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
             }
             
-            response = requests.get(url, headers=headers, params=querystring, timeout=10)
+            session = self.get_session('JSearch')
+            response = self.provider_resilience.call(
+                'JSearch',
+                lambda: session.get(url, headers=headers, params=querystring, timeout=self.PROVIDER_TIMEOUT),
+                budget=self.PROVIDER_TIMEOUT
+            )
             
             if response.status_code == 200:
                 data = response.json()
@@ -153,16 +3238,26 @@ class AscendAIAgent:
                 
                 return jobs
             
+            self.tracer.count('provider.errors', provider='JSearch', status=response.status_code)
+            if raise_errors:
+                raise ProviderError(f"JSearch returned HTTP {response.status_code}")
+            
         except Exception as e:
+            if raise_errors and isinstance(e, ProviderError):
+                raise
+            self.tracer.count('provider.errors', provider='JSearch', error=type(e).__name__)
             print(f"Error fetching from JSearch: {e}")
+            if raise_errors:
+                raise ProviderError(f"JSearch request failed: {e}") from e
         
         return []
     
     def scrape_local_jobs(self, location, skills_query):
+        # Feed postings reach searches through the stored corpus
+        # (load_corpus_jobs), so this provider only makes sure the background
+        # ingester is running and returns nothing itself.
         try:
-            jobs = []
-            return jobs
-            
+            self.local_feed_ingester.start()
         except Exception as e:
             print(f"Error scraping local jobs: {e}")
         
@@ -173,61 +3268,225 @@ class AscendAIAgent:
             print("No job data available. Please fetch jobs first.")
             return
         
-        job_texts = []
-        for job in self.job_data:
-            combined_text = f"{job['title']} {job['description']}"
-            job_texts.append(combined_text)
+        if 'id' not in self.job_data[0]:
+            self.job_data, _ = self.job_store.add_jobs(self.job_data)
         
-        self.job_vectors = self.vectorizer.fit_transform(job_texts)
+        with self.tracer.span('prepare_job_vectors', jobs=len(self.job_data)):
+            self.vectorizer, self.job_vectors = self.job_index.get_vectors(self.job_data)
         print("Job vectors prepared for matching!")
     
-    def calculate_skill_relevance(self, user_skills, job_text):
-        user_skills_list = [skill.strip().lower() for skill in user_skills.split(',')]
-        job_text_lower = job_text.lower()
+    def load_corpus_jobs(self, location, fetched_jobs, user_skills=None):
+        job_ids = set(job['id'] for job in fetched_jobs)
+        job_ids.update(self.job_store.find_job_ids(location, self.CORPUS_MAX_AGE_DAYS, self.SEARCH_RADIUS_KM))
         
-        matches = 0
-        for skill in user_skills_list:
-            if skill in job_text_lower:
-                matches += 1
+        # Large cities only score the best RETRIEVAL_POOL postings by TF-IDF
+        # similarity; small candidate sets are still scored in full.
+        if user_skills and len(job_ids) > self.RETRIEVAL_MIN_CANDIDATES:
+            retrieved = self.job_index.search(self.match_query(user_skills, location), self.RETRIEVAL_POOL, allowed_ids=job_ids)
+            if retrieved:
+                job_ids = set(job_id for job_id, _ in retrieved)
         
-        return (matches / len(user_skills_list)) * 100 if user_skills_list else 0
+        return self.job_table.records(sorted(job_ids))
     
-    def find_opportunities(self, user_skills, location, experience_level="entry"):
+    def match_query(self, user_skills, location):
+        # A location the gazetteer knows is already enforced by the candidate
+        # filter, so only unknown locations are added to the TF-IDF query.
+        if self.gazetteer.resolve(location):
+            return user_skills
+        return f"{user_skills} {location}"
+    
+    def calculate_skill_relevance(self, user_skills, job_text):
+        return float(SkillMatcher(user_skills).relevance([job_text])[0])
+    
+    def print_search_header(self, user_skills, location, experience_level):
         print(f"Finding opportunities for:")
         print(f"Location: {location}")
         print(f"Skills: {user_skills}")
         print(f"Experience: {experience_level}")
         print("-" * 50)
+    
+    def find_opportunities(self, user_skills, location, experience_level="entry"):
+        self.print_search_header(user_skills, location, experience_level)
         
-        jobs = self.fetch_real_time_jobs(location, user_skills)
+        fetched_jobs = self.fetch_real_time_jobs(location, user_skills)
+        jobs = self.load_corpus_jobs(location, fetched_jobs, user_skills)
         
         if not jobs:
             print("No opportunities found in your area.")
             return []
         
+        return self.rank_opportunities(user_skills, location, jobs)
+    
+    def stream_opportunities(self, user_skills, location, experience_level="entry", deadline=None):
+        # Yields a SearchUpdate with a provisional ranking from the stored
+        # corpus straight away, then a re-ranked one as each provider answers,
+        # so callers can show results in the time of the fastest provider.
+        deadline = self.SEARCH_DEADLINE if deadline is None else deadline
+        self.print_search_header(user_skills, location, experience_level)
+        print(f"Searching for jobs in {location}...")
+        
+        futures = self.submit_providers(location, user_skills)
+        # The deadline runs from submission, so the provisional ranking (and
+        # however long the caller takes to consume it) comes out of it.
+        started = time.monotonic()
+        pending = [name for name in self.providers]
+        completed = []
+        fetched_jobs = []
+        
+        jobs = self.load_corpus_jobs(location, fetched_jobs, user_skills)
+        if jobs:
+            yield SearchUpdate(self.rank_opportunities(user_skills, location, jobs), list(completed), list(pending), False)
+        
+        try:
+            remaining = max(0.0, deadline - (time.monotonic() - started))
+            for future in as_completed(futures, timeout=remaining):
+                name = futures[future]
+                try:
+                    provider_jobs = future.result() or []
+                except Exception as e:
+                    self.tracer.count('provider.errors', provider=name, error=type(e).__name__)
+                    print(f"Error fetching from {name}: {e}")
+                    provider_jobs = []
+                
+                pending.remove(name)
+                completed.append(name)
+                if provider_jobs:
+                    fetched_jobs.extend(self.store_fetched_jobs(provider_jobs))
+                
+                jobs = self.load_corpus_jobs(location, fetched_jobs, user_skills)
+                ranked = self.rank_opportunities(user_skills, location, jobs) if jobs else []
+                yield SearchUpdate(ranked, list(completed), list(pending), not pending)
+        except FutureTimeoutError:
+            for future, name in futures.items():
+                if name in pending:
+                    future.cancel()
+                    self.tracer.count('provider.deadline_missed', provider=name)
+                    print(f"{name} missed the {deadline}s search deadline, returning partial results")
+            
+            jobs = self.load_corpus_jobs(location, fetched_jobs, user_skills)
+            ranked = self.rank_opportunities(user_skills, location, jobs) if jobs else []
+            yield SearchUpdate(ranked, list(completed), list(pending), True)
+    
+    def rank_opportunities(self, user_skills, location, jobs):
+        self.job_data = jobs
         self.prepare_job_vectors()
+        return self.score_opportunities(user_skills, location, jobs, self.vectorizer, self.job_vectors)
+    
+    def score_opportunities(self, user_skills, location, jobs, vectorizer=None, job_vectors=None):
+        # Reads only shared, thread-safe state, so concurrent searches can call
+        # it without touching self.job_data / self.job_vectors.
+        if vectorizer is None or job_vectors is None:
+            vectorizer, job_vectors = self.job_index.get_vectors(jobs)
+        
+        with self.tracer.span('score_jobs', jobs=len(jobs)):
+            user_query = self.match_query(user_skills, location)
+            user_vector = vectorizer.transform([user_query])
+            
+            similarities = sklearn_pairwise.cosine_similarity(user_vector, job_vectors)[0]
+            
+            skill_relevances = SkillMatcher(user_skills).relevance(job_texts(jobs))
+            
+            ranked_opportunities = []
+            for i, job in enumerate(jobs):
+                skill_relevance = float(skill_relevances[i])
+                
+                combined_score = (similarities[i] * 0.7) + (skill_relevance/100 * 0.3)
+                
+                ranked_opportunities.append({
+                    'job': job,
+                    'match_score': combined_score,
+                    'skill_relevance': skill_relevance
+                })
+            
+            ranked_opportunities.sort(key=lambda x: x['match_score'], reverse=True)
+        
+        return ranked_opportunities
+    
+    def search_opportunities(self, user_skills, location):
+        # Request-scoped equivalent of find_opportunities: same pipeline, no
+        # console output and no writes to the agent's per-search attributes.
+        with self.tracer.span('search.fetch', location=location) as span:
+            fetched_jobs = self.store_fetched_jobs(self.fetch_from_providers(location, user_skills))
+            span.set('jobs', len(fetched_jobs))
+        
+        jobs = self.load_corpus_jobs(location, fetched_jobs, user_skills)
+        if not jobs:
+            return []
+        return self.score_opportunities(user_skills, location, jobs)
+    
+    def batch_match(self, user_profiles, k=10, batch_size=256):
+        # Ranks the stored corpus for many users at once (e.g. nightly job-alert
+        # digests). user_profiles is a list of {'skills': ..., 'location': ...}.
+        n_users = len(user_profiles)
+        job_ids = np.full((n_users, k), -1, dtype=np.int64)
+        scores = np.full((n_users, k), -np.inf, dtype=np.float32)
+        relevances = np.zeros((n_users, k), dtype=np.float32)
+        
+        vectorizer, job_vectors, row_ids = self.job_index.snapshot()
+        if vectorizer is None or not row_ids or not n_users:
+            return MatchResult(job_ids, scores, relevances)
         
-        user_query = f"{user_skills} {location}"
-        user_vector = self.vectorizer.transform([user_query])
+        corpus = self.job_table.records(row_ids)
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        job_vectors_t = job_vectors.T.tocsc()
         
-        similarities = cosine_similarity(user_vector, self.job_vectors)[0]
+        # One matcher over every distinct skill in the batch scans the corpus
+        # once, a chunk of texts at a time; each user's relevance is then a
+        # sparse product with it.
+        skill_matcher = SkillMatcher([skill for profile in user_profiles for skill in profile['skills'].split(',')])
+        skill_incidence_t = sparse.vstack(
+            [skill_matcher.incidence(texts) for _, texts in corpus.text_chunks()],
+            format='csr'
+        ).T.tocsc()
+        skill_positions = {skill: i for i, skill in enumerate(skill_matcher.skills)}
         
-        ranked_opportunities = []
-        for i, job in enumerate(jobs):
-            job_text = f"{job['title']} {job['description']}"
-            skill_relevance = self.calculate_skill_relevance(user_skills, job_text)
+        location_masks = {}
+        
+        for start in range(0, n_users, batch_size):
+            chunk = user_profiles[start:start + batch_size]
+            
+            queries = vectorizer.transform([self.match_query(profile['skills'], profile['location']) for profile in chunk])
+            similarities = (queries @ job_vectors_t).toarray()
+            relevance = self.batch_skill_relevance([profile['skills'] for profile in chunk], skill_positions, skill_incidence_t)
+            chunk_scores = (similarities * 0.7) + (relevance * 0.3)
             
-            combined_score = (similarities[i] * 0.7) + (skill_relevance/100 * 0.3)
+            for i, profile in enumerate(chunk):
+                location = profile['location'].strip().lower()
+                if location not in location_masks:
+                    candidate_ids = self.job_store.find_job_ids(location, self.CORPUS_MAX_AGE_DAYS, self.SEARCH_RADIUS_KM)
+                    location_masks[location] = np.isin(row_ids, candidate_ids)
+                chunk_scores[i, ~location_masks[location]] = -np.inf
             
-            ranked_opportunities.append({
-                'job': job,
-                'match_score': combined_score,
-                'skill_relevance': skill_relevance
-            })
+            top = top_k_indices(chunk_scores, k)
+            top_scores = np.take_along_axis(chunk_scores, top, axis=1)
+            valid = np.isfinite(top_scores)
+            
+            rows = slice(start, start + len(chunk))
+            width = top.shape[1]
+            job_ids[rows, :width] = np.where(valid, row_ids[top], -1)
+            scores[rows, :width] = top_scores
+            relevances[rows, :width] = np.where(valid, np.take_along_axis(relevance, top, axis=1) * 100, 0)
         
-        ranked_opportunities.sort(key=lambda x: x['match_score'], reverse=True)
+        return MatchResult(job_ids, scores, relevances)
+    
+    def batch_skill_relevance(self, user_skills_batch, skill_positions, skill_incidence_t):
+        # Fraction of each user's skills found in each job, as a dense
+        # (users x jobs) array; skill_incidence_t is SkillMatcher.incidence().T.
+        weights = sparse.lil_matrix((len(user_skills_batch), len(skill_positions)), dtype=np.float64)
+        for i, user_skills in enumerate(user_skills_batch):
+            user_skills_list = SkillMatcher(user_skills).skills
+            for skill in user_skills_list:
+                weights[i, skill_positions[skill]] = 1.0 / len(user_skills_list)
         
-        return ranked_opportunities
+        return (weights.tocsr() @ skill_incidence_t).toarray()
+    
+    def display_provisional(self, update, top_n=3):
+        waiting = ", ".join(update.pending_providers) or "nothing"
+        print(f"Provisional top matches ({len(update.opportunities)} so far, waiting on {waiting}):")
+        for i, opp in enumerate(update.opportunities[:top_n], 1):
+            job = opp['job']
+            print(f"  {i}. {job['title']} at {job['company']} ({opp['match_score']:.1%})")
+        print()
     
     def display_opportunities(self, opportunities):
         if not opportunities:
@@ -254,44 +3513,27 @@ class AscendAIAgent:
             print(f"Skill Relevance: {skill_relevance:.1f}%")
             print(f"Description: {job['description'][:200]}...")
             print(f"Apply: {job['url']}")
+            for url in job.get('source_urls', []):
+                if url != job['url']:
+                    print(f"Also listed at: {url}")
             print()
     
-    def get_upskilling_suggestions(self, user_skills, opportunities):
+    def get_upskilling_suggestions(self, user_skills, opportunities, location=None):
         if not opportunities:
             return []
         
-        skill_keywords = []
-        for opp in opportunities[:3]:
-            job_text = f"{opp['job']['title']} {opp['job']['description']}"
-            words = re.findall(r'\b[A-Za-z]+\b', job_text.lower())
-            skill_keywords.extend(words)
-        
-        from collections import Counter
-        common_skills = Counter(skill_keywords).most_common(20)
-        
-        user_skills_list = [skill.strip().lower() for skill in user_skills.split(',')]
-        
-        stop_words = {'and', 'the', 'for', 'with', 'or', 'in', 'on', 'at', 'to', 'of', 'a', 'an', 
-                     'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 
-                     'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 
-                     'shall', 'this', 'that', 'these', 'those', 'we', 'you', 'they', 'he', 'she', 
-                     'it', 'i', 'me', 'us', 'them', 'him', 'her', 'my', 'your', 'our', 'their', 
-                     'his', 'its', 'auction', 'experience', 'work', 'working', 'job', 'position',
-                     'role', 'team', 'company', 'business', 'years', 'skills', 'knowledge'}
-        
-        suggested_skills = []
-        for skill, count in common_skills:
-            if (skill not in user_skills_list and 
-                len(skill) > 2 and 
-                skill not in stop_words and
-                count >= 2):
-                suggested_skills.append(skill.title())
+        # Demand comes from every posting in the city over the last 30 days,
+        # not only from the top matches.
+        if location is None:
+            location = opportunities[0]['job']['location']
+        missing = self.skill_demand.missing_skills(user_skills, location, window=30, n=10)
+        suggested_skills = [skill.title() for skill, _ in missing]
         
         if suggested_skills and len(suggested_skills) > 0:
             print("UPSKILLING SUGGESTIONS:")
             print("Based on current job market demands, consider learning:")
-            for skill in suggested_skills[:5]:
-                print(f"- {skill}")
+            for skill, share in missing[:5]:
+                print(f"- {skill.title()} (in {share:.0%} of recent postings)")
             print()
             print("Recommended learning resources:")
             print("- Online courses (Coursera, Udemy, edX)")
@@ -314,14 +3556,18 @@ class AscendAIAgent:
         
         job_analysis = self.prepare_job_analysis(opportunities[:5])
         
-        recommendations = self.generate_chat_recommendations(user_skills, job_analysis, experience_level)
-        
         print("\nAI CAREER COACH RECOMMENDATIONS:")
         print("=" * 60)
-        print(recommendations)
+        
+        # Advice is printed as Gemini generates it.
+        chunks = []
+        for chunk in self.stream_chat_recommendations(user_skills, job_analysis, experience_level):
+            print(chunk, end="", flush=True)
+            chunks.append(chunk)
+        print()
         print("=" * 60)
         
-        return recommendations
+        return "".join(chunks)
     
     def prepare_job_analysis(self, opportunities):
         job_summaries = []
@@ -333,7 +3579,9 @@ class AscendAIAgent:
                 'position': i,
                 'title': job['title'],
                 'company': job['company'],
-                'description': job['description'][:300],
+                'description': job['description'],
+                'salary': job.get('salary'),
+                'location': job['location'],
                 'match_score': opp['match_score'],
                 'skill_relevance': opp['skill_relevance']
             }
@@ -341,113 +3589,75 @@ class AscendAIAgent:
         
         return job_summaries
     
+    def build_recommendation_prompt(self, user_skills, job_analysis, experience_level):
+        return self.prompt_builder.build(user_skills, job_analysis, experience_level)
+    
     def generate_chat_recommendations(self, user_skills, job_analysis, experience_level):
         try:
-            jobs_text = ""
-            for job in job_analysis:
-                jobs_text += f"\n{job['position']}. {job['title']} at {job['company']}\n"
-                jobs_text += f"   Match Score: {job['match_score']:.1%}\n"
-                jobs_text += f"   Description: {job['description']}\n"
+            recommendations = self.recommendation_cache.get(user_skills, job_analysis, experience_level)
+            if recommendations:
+                return recommendations
             
-            prompt = f"""
-You are an expert career coach and resume advisor. Analyze the following job opportunities and provide personalized recommendations.
-
-USER PROFILE:
-- Current Skills: {user_skills}
-- Experience Level: {experience_level}
-
-TOP JOB OPPORTUNITIES:
-{jobs_text}
-
-Please provide:
-
-1. RESUME OPTIMIZATION TIPS:
-   - What keywords should be emphasized in the resume
-   - How to highlight relevant experience
-   - What skills to prioritize in the skills section
-   - Suggestions for resume formatting and structure
-
-2. APPLICATION STRATEGY:
-   - Which jobs to prioritize based on match scores
-   - How to tailor applications for each role
-   - Key points to emphasize in cover letters
-   - Interview preparation tips
-
-3. SKILL DEVELOPMENT PLAN:
-   - Missing skills that appear frequently in job descriptions
-   - Priority order for learning new skills
-   - Specific course recommendations with platforms
-   - Timeline for skill development
-
-4. INDUSTRY INSIGHTS:
-   - Current market trends in these roles
-   - Salary negotiation tips
-   - Career growth opportunities
-
-Keep the advice practical, actionable, and encouraging. Focus on immediate steps the user can take to improve their job prospects.
-"""
+            prompt = self.build_recommendation_prompt(user_skills, job_analysis, experience_level)
             
             recommendations = self.call_gemini_api(prompt)
             
-            if not recommendations:
+            if recommendations:
+                self.recommendation_cache.put(user_skills, job_analysis, experience_level, recommendations)
+            else:
+                self.tracer.count('recommendations.fallback', reason='gemini_unavailable')
                 recommendations = self.generate_fallback_recommendations(user_skills, job_analysis, experience_level)
             
             return recommendations
             
         except Exception as e:
             print(f"Error generating recommendations: {e}")
+            self.tracer.count('recommendations.fallback', reason=type(e).__name__)
             return self.generate_fallback_recommendations(user_skills, job_analysis, experience_level)
     
+    def stream_chat_recommendations(self, user_skills, job_analysis, experience_level):
+        # Streaming variant of generate_chat_recommendations: yields text as it
+        # arrives, or the fallback advice in one piece if Gemini produced none.
+        cached = self.recommendation_cache.get(user_skills, job_analysis, experience_level)
+        if cached:
+            yield cached
+            return
+        
+        chunks = []
+        produced = False
+        try:
+            prompt = self.build_recommendation_prompt(user_skills, job_analysis, experience_level)
+            for chunk in self.gemini_client.stream(prompt):
+                produced = True
+                chunks.append(chunk)
+                yield chunk
+            if produced:
+                self.recommendation_cache.put(user_skills, job_analysis, experience_level, "".join(chunks))
+        except Exception as e:
+            print(f"Error generating recommendations: {e}")
+            if not produced:
+                self.tracer.count('recommendations.fallback', reason=type(e).__name__)
+                yield self.generate_fallback_recommendations(user_skills, job_analysis, experience_level)
+            return
+        
+        if not produced:
+            self.tracer.count('recommendations.fallback', reason='gemini_unavailable')
+            yield self.generate_fallback_recommendations(user_skills, job_analysis, experience_level)
+    
     def call_gemini_api(self, prompt):
         try:
-            import google.generativeai as genai
-            
-            genai.configure(api_key=self.GEMINI_API_KEY)
-            
-            model_names = [
-                'gemini-1.5-flash',
-                'gemini-1.5-pro',
-                'gemini-pro',
-                'models/gemini-pro'
-            ]
-            
-            for model_name in model_names:
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    
-                    system_prompt = "You are an expert career coach and resume advisor helping job seekers improve their prospects. Provide practical, actionable advice."
-                    
-                    full_prompt = f"{system_prompt}\n\n{prompt}"
-                    
-                    response = model.generate_content(full_prompt)
-                    
-                    print(f"Successfully used model: {model_name}")
-                    return response.text
-                    
-                except Exception as model_error:
-                    print(f"Model {model_name} failed: {str(model_error)}")
-                    continue
-            
-            print("All Gemini models failed")
-            return None
+            recommendations = self.gemini_client.generate(prompt)
+            if recommendations is None:
+                print("All Gemini models failed")
+            return recommendations
             
         except Exception as e:
             print(f"Gemini API error: {e}")
             return None
     
     def generate_fallback_recommendations(self, user_skills, job_analysis, experience_level):
-        user_skills_list = [skill.strip().lower() for skill in user_skills.split(',')]
-        
-        all_descriptions = " ".join([job['description'] for job in job_analysis])
-        common_keywords = re.findall(r'\b[A-Za-z]+\b', all_descriptions.lower())
-        
-        from collections import Counter
-        keyword_counts = Counter(common_keywords)
-        
-        missing_skills = []
-        for keyword, count in keyword_counts.most_common(20):
-            if len(keyword) > 2 and keyword not in user_skills_list:
-                missing_skills.append(keyword.title())
+        location = job_analysis[0].get('location', '') if job_analysis else ''
+        missing_skills = [skill.title() for skill, _ in self.skill_demand.missing_skills(user_skills, location)]
         
         recommendations = f"""
 1. RESUME OPTIMIZATION TIPS:
@@ -486,6 +3696,194 @@ Next Steps:
         
         return recommendations
 
+class ServiceOverloaded(Exception):
+    pass
+
+
+class AscendService:
+    # Long-running HTTP/JSON front end for one shared agent. Each request gets
+    # its own search state; at most max_concurrency searches run at once on
+    # worker threads, up to max_queue more wait, and anything beyond that is
+    # turned away with 503 so callers back off instead of piling up.
+    #
+    #   POST /search           {"skills": "...", "location": "...", "limit": 10}
+    #   POST /recommendations  {"skills": "...", "location": "...", "experience_level": "entry"}
+    #   GET  /health
+    MAX_BODY_BYTES = 64 * 1024
+    STATUS_TEXT = {
+        200: 'OK',
+        400: 'Bad Request',
+        404: 'Not Found',
+        413: 'Payload Too Large',
+        500: 'Internal Server Error',
+        503: 'Service Unavailable',
+        504: 'Gateway Timeout'
+    }
+    
+    def __init__(self, agent, max_concurrency=8, max_queue=32, request_timeout=30):
+        self.agent = agent
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='ascend-search')
+        self.semaphore = None
+        self.server = None
+        self.in_flight = 0
+        self.waiting = 0
+    
+    async def start(self, host='127.0.0.1', port=8080):
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+    
+    async def serve_forever(self, host='127.0.0.1', port=8080):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Ascend service listening on http://{address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
+    
+    async def run_blocking(self, function, *args):
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            raise ServiceOverloaded()
+        
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        future = loop.run_in_executor(self.executor, functools.partial(function, *args))
+        
+        # The slot is released when the worker thread finishes, not when the
+        # client gives up, so a timeout never lets more work in than we run.
+        def release(_):
+            self.in_flight -= 1
+            self.semaphore.release()
+        future.add_done_callback(release)
+        
+        return await asyncio.wait_for(asyncio.shield(future), self.request_timeout)
+    
+    @staticmethod
+    def serialize_opportunities(opportunities, limit):
+        return [{
+            'job': dict(opp['job']),
+            'match_score': float(opp['match_score']),
+            'skill_relevance': float(opp['skill_relevance'])
+        } for opp in opportunities[:limit]]
+    
+    def search(self, skills, location, limit):
+        return self.serialize_opportunities(self.agent.search_opportunities(skills, location), limit)
+    
+    def recommendations(self, skills, location, experience_level):
+        opportunities = self.agent.search_opportunities(skills, location)
+        if not opportunities:
+            return {'opportunities': [], 'recommendations': "No job opportunities found to analyze."}
+        
+        job_analysis = self.agent.prepare_job_analysis(opportunities[:5])
+        return {
+            'opportunities': self.serialize_opportunities(opportunities, 5),
+            'recommendations': self.agent.generate_chat_recommendations(skills, job_analysis, experience_level)
+        }
+    
+    async def dispatch(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'in_flight': self.in_flight, 'queued': self.waiting}
+        if method != 'POST' or path not in ('/search', '/recommendations'):
+            return 404, {'error': 'not found'}
+        
+        try:
+            request = json.loads(body or b'{}')
+            skills = str(request['skills']).strip()
+            location = str(request['location']).strip()
+            limit = int(request.get('limit', 10))
+            experience_level = str(request.get('experience_level', 'entry'))
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': f"invalid request: {e}"}
+        if not skills or not location:
+            return 400, {'error': "both skills and location are required"}
+        
+        try:
+            if path == '/search':
+                opportunities = await self.run_blocking(self.search, skills, location, limit)
+                return 200, {'count': len(opportunities), 'opportunities': opportunities}
+            return 200, await self.run_blocking(self.recommendations, skills, location, experience_level)
+        except ServiceOverloaded:
+            return 503, {'error': 'server busy, retry later'}
+        except asyncio.TimeoutError:
+            return 504, {'error': f"search did not finish within {self.request_timeout}s"}
+        except Exception as e:
+            print(f"Error handling {path}: {e}")
+            return 500, {'error': 'internal error'}
+    
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    break
+                method, target, version = parts
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                length = int(headers.get('content-length') or 0)
+                if length > self.MAX_BODY_BYTES:
+                    status, payload = 413, {'error': 'request body too large'}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.dispatch(method, target.split('?', 1)[0], body)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                
+                data = json.dumps(payload, default=str).encode('utf-8')
+                head = [
+                    f"HTTP/1.1 {status} {self.STATUS_TEXT.get(status, 'OK')}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(data)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}"
+                ]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + data)
+                await writer.drain()
+                
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_service(host='127.0.0.1', port=8080, max_concurrency=8, max_queue=32):
+    agent = AscendAIAgent(provider_workers=max_concurrency * 3)
+    agent.prewarm()
+    service = AscendService(agent, max_concurrency=max_concurrency, max_queue=max_queue)
+    try:
+        asyncio.run(service.serve_forever(host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        agent.close()
+
+
 def interactive_search():
     agent = AscendAIAgent()
     
@@ -504,12 +3902,16 @@ def interactive_search():
             print("Please enter both skills and location!")
             continue
         
-        opportunities = agent.find_opportunities(user_skills, location, experience)
+        opportunities = []
+        for update in agent.stream_opportunities(user_skills, location, experience):
+            opportunities = update.opportunities
+            if not update.final:
+                agent.display_provisional(update)
         
         agent.display_opportunities(opportunities)
         
         if opportunities:
-            agent.get_upskilling_suggestions(user_skills, opportunities)
+            agent.get_upskilling_suggestions(user_skills, opportunities, location)
         
         if opportunities:
             print("\nWould you like personalized AI recommendations for resume optimization and career strategy?")
@@ -525,4 +3927,17 @@ def interactive_search():
     print("Thank you for using Ascend AI Agent!")
 
 if __name__ == "__main__":
-    interactive_search()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Ascend - Local Opportunity Connector")
+    parser.add_argument('mode', nargs='?', choices=['interactive', 'serve'], default='interactive')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-concurrency', type=int, default=8)
+    parser.add_argument('--max-queue', type=int, default=32)
+    args = parser.parse_args()
+    
+    if args.mode == 'serve':
+        run_service(args.host, args.port, args.max_concurrency, args.max_queue)
+    else:
+        interactive_search()
\ No newline at end of file
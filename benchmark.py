@@ -0,0 +1,448 @@
+# Ascend - Benchmark Harness
+# Runs AscendAIAgent against a synthetic job corpus served by local stand-ins
+# for Adzuna, JSearch and Gemini, and writes latency/throughput results as JSON.
+#
+# Example:
+#   python benchmark.py --sizes 100 1000 10000 --iterations 20 --output bench.json
+#   python benchmark.py --check-resilience
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+from ascend import AscendAIAgent, GeminiClient, ProviderResilience, ProviderUnavailable
+
+
+CITIES = ['Bangalore', 'Mumbai', 'Delhi', 'Hyderabad', 'Chennai', 'Pune', 'Kolkata', 'Jaipur']
+ROLES = ['Data Analyst', 'Software Engineer', 'Sales Executive', 'Accountant', 'Marketing Associate',
+         'Customer Support Agent', 'Machine Learning Engineer', 'Business Analyst', 'Web Developer', 'HR Executive']
+SKILLS = ['python', 'sql', 'excel', 'java', 'javascript', 'react', 'machine learning', 'power bi', 'tableau',
+          'communication', 'negotiation', 'tally', 'gst', 'crm', 'seo', 'aws', 'docker', 'statistics']
+FILLER = ['team', 'client', 'project', 'deliver', 'support', 'growth', 'reports', 'manage', 'office', 'customers',
+          'strong', 'develop', 'daily', 'process', 'quality', 'target', 'tools', 'business', 'improve', 'across']
+
+
+def generate_jobs(count, description_words=120, seed=42):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        role = rng.choice(ROLES)
+        city = rng.choice(CITIES)
+        skills = rng.sample(SKILLS, 4)
+        words = []
+        while len(words) < description_words:
+            words.append(rng.choice(skills) if rng.random() < 0.15 else rng.choice(FILLER))
+        salary_min = rng.randrange(200000, 1200000, 50000)
+        jobs.append({
+            'id': i,
+            'title': role,
+            'company': f"Company {rng.randrange(count // 5 + 1)}",
+            'city': city,
+            'state': 'India',
+            'description': f"Looking for a {role} skilled in {', '.join(skills)}. " + " ".join(words),
+            'salary_min': salary_min,
+            'salary_max': salary_min + 300000,
+            'created': '2026-10-01T00:00:00Z'
+        })
+    return jobs
+
+
+class EventStream:
+    # Handler payload sent as server-sent events, one every interval_ms.
+    def __init__(self, events, interval_ms=0):
+        self.events = events
+        self.interval_ms = interval_ms
+
+
+class MockService:
+    # A local HTTP server with configurable latency and error rate. handler
+    # receives (method, path, query, body) and returns (status, payload).
+    # slow_rate of requests take an extra slow_ms, to reproduce tail latency.
+    def __init__(self, handler, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=0, slow_rate=0.0, slow_ms=0):
+        self.handler = handler
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def handle_request(self, method):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+
+                with service.rng_lock:
+                    service.requests += 1
+                    delay = max(0.0, service.latency_ms + service.rng.uniform(-service.jitter_ms, service.jitter_ms)) / 1000
+                    if service.rng.random() < service.slow_rate:
+                        delay += service.slow_ms / 1000
+                    failed = service.rng.random() < service.error_rate
+                time.sleep(delay)
+
+                if failed:
+                    status, payload = 503, {'error': 'injected failure'}
+                else:
+                    status, payload = service.handler(method, parsed.path, parse_qs(parsed.query), body)
+
+                if isinstance(payload, EventStream):
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Connection', 'close')
+                    self.end_headers()
+                    for i, event in enumerate(payload.events):
+                        if i:
+                            time.sleep(payload.interval_ms / 1000)
+                        self.wfile.write(b'data: ' + json.dumps(event).encode('utf-8') + b'\r\n\r\n')
+                        self.wfile.flush()
+                    self.close_connection = True
+                    return
+
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self.handle_request('GET')
+
+            def do_POST(self):
+                self.handle_request('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def matching_jobs(jobs, location, query):
+    city = location.split(',')[0].strip().lower()
+    return [job for job in jobs if job['city'].lower() == city]
+
+
+def adzuna_handler(jobs):
+    def handle(method, path, query, body):
+        page = int(path.rstrip('/').rsplit('/', 1)[-1] or 1)
+        per_page = int(query.get('results_per_page', ['10'])[0])
+        found = matching_jobs(jobs, query.get('where', [''])[0], query.get('what', [''])[0])
+        start = (page - 1) * per_page
+        results = [{
+            'title': job['title'],
+            'company': {'display_name': job['company']},
+            'location': {'display_name': f"{job['city']}, {job['state']}"},
+            'description': job['description'][:500],
+            'redirect_url': f"https://adzuna.example/jobs/{job['id']}",
+            'salary_min': job['salary_min'],
+            'salary_max': job['salary_max'],
+            'created': job['created']
+        } for job in found[start:start + per_page]]
+        return 200, {'count': len(found), 'results': results}
+    return handle
+
+
+def jsearch_handler(jobs):
+    def handle(method, path, query, body):
+        text = query.get('query', [''])[0]
+        skills, _, location = text.rpartition(' in ')
+        page = int(query.get('page', ['1'])[0])
+        num_pages = int(query.get('num_pages', ['1'])[0])
+        found = matching_jobs(jobs, location, skills)
+        start = (page - 1) * 10
+        data = [{
+            'job_title': job['title'],
+            'employer_name': job['company'],
+            'job_city': job['city'],
+            'job_state': job['state'],
+            'job_description': job['description'],
+            'job_apply_link': f"https://jsearch.example/jobs/{job['id']}",
+            'job_salary': None,
+            'job_posted_at_datetime_utc': job['created']
+        } for job in found[start:start + 10 * num_pages]]
+        return 200, {'status': 'OK', 'data': data}
+    return handle
+
+
+def gemini_handler(response_words=300, stream_chunks=10, stream_interval_ms=0):
+    # Service latency models time to first token; streamed responses then send
+    # stream_chunks pieces stream_interval_ms apart.
+    sentences = ["Focus on the highest-matching roles and tailor your resume. "] * (response_words // 10)
+    text = "".join(sentences)
+
+    def candidate(part):
+        return {
+            'candidates': [{
+                'content': {'parts': [{'text': part}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }]
+        }
+
+    size = max(1, -(-len(sentences) // stream_chunks))
+    parts = ["".join(sentences[i:i + size]) for i in range(0, len(sentences), size)]
+
+    def handle(method, path, query, body):
+        if path.endswith(':generateContent'):
+            # A blocking call waits for the whole response to be generated.
+            time.sleep((len(parts) - 1) * stream_interval_ms / 1000)
+            return 200, candidate(text)
+        if path.endswith(':streamGenerateContent'):
+            return 200, EventStream([candidate(part) for part in parts], stream_interval_ms)
+        if path.endswith('/models'):
+            return 200, {'models': [{'name': 'models/gemini-1.5-flash', 'supportedGenerationMethods': ['generateContent', 'streamGenerateContent']}]}
+        return 404, {'error': 'not found'}
+    return handle
+
+
+def percentile_summary(operation, corpus_size, latencies, errors, wall_time):
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        'operation': operation,
+        'corpus_size': corpus_size,
+        'iterations': len(latencies),
+        'errors': errors,
+        'throughput_per_s': len(latencies) / wall_time if wall_time else 0.0,
+        'mean_ms': float(latencies_ms.mean()) if len(latencies) else None,
+        'p50_ms': float(np.percentile(latencies_ms, 50)) if len(latencies) else None,
+        'p95_ms': float(np.percentile(latencies_ms, 95)) if len(latencies) else None,
+        'p99_ms': float(np.percentile(latencies_ms, 99)) if len(latencies) else None
+    }
+
+
+def measure(operation, corpus_size, iterations, function):
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                function(i)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - call_started)
+    return percentile_summary(operation, corpus_size, latencies, errors, time.perf_counter() - started)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def run_scale(corpus_size, args):
+    jobs = generate_jobs(corpus_size, args.description_words, seed=args.seed)
+    services = {
+        'Adzuna': MockService(adzuna_handler(jobs), args.adzuna_latency_ms, args.jitter_ms, args.error_rate, seed=1,
+                              slow_rate=args.slow_rate, slow_ms=args.slow_ms).start(),
+        'JSearch': MockService(jsearch_handler(jobs), args.jsearch_latency_ms, args.jitter_ms, args.error_rate, seed=2,
+                               slow_rate=args.slow_rate, slow_ms=args.slow_ms).start(),
+        'Gemini': MockService(gemini_handler(stream_interval_ms=args.gemini_stream_interval_ms), args.gemini_latency_ms, args.jitter_ms, args.error_rate, seed=3).start()
+    }
+    data_dir = tempfile.mkdtemp(prefix='ascend-bench-')
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = AscendAIAgent(data_dir=data_dir)
+        agent.ADZUNA_BASE_URL = services['Adzuna'].url + '/v1/api/jobs/in/search'
+        agent.JSEARCH_BASE_URL = services['JSearch'].url + '/search'
+        agent.GEMINI_API_ENDPOINT = services['Gemini'].url
+        agent.GEMINI_API_KEY = 'benchmark'
+        # Lift the free-tier request budget so every iteration reaches the mock.
+        agent.gemini_client.close()
+        agent.gemini_client = GeminiClient(agent.get_gemini, tracer=agent.tracer, requests_per_minute=args.gemini_rpm)
+        if not args.cache:
+            agent.provider_cache.ttls.clear()
+
+        rng = random.Random(args.seed)
+        searches = [(", ".join(rng.sample(SKILLS, 3)), rng.choice(CITIES)) for _ in range(args.iterations)]
+        results = []
+
+        results.append(measure('fetch_real_time_jobs', corpus_size, args.iterations,
+                               lambda i: agent.fetch_real_time_jobs(searches[i][1], searches[i][0])))
+
+        # Load the whole synthetic corpus so the matching stages run at scale.
+        corpus = [{
+            'title': job['title'],
+            'company': job['company'],
+            'location': f"{job['city']}, {job['state']}",
+            'description': job['description'],
+            'url': f"https://corpus.example/jobs/{job['id']}",
+            'salary': 'Not specified',
+            'posted_date': job['created'],
+            'source': 'Synthetic'
+        } for job in jobs]
+        with contextlib.redirect_stdout(io.StringIO()):
+            corpus = agent.store_fetched_jobs(corpus)
+
+        def prepare(i):
+            agent.job_data = corpus
+            agent.prepare_job_vectors()
+
+        results.append(measure('prepare_job_vectors', corpus_size, args.iterations, prepare))
+
+        opportunities = {}
+
+        def find(i):
+            opportunities[i] = agent.find_opportunities(searches[i][0], searches[i][1])
+
+        results.append(measure('find_opportunities', corpus_size, args.iterations, find))
+        results.append(measure('get_upskilling_suggestions', corpus_size, args.iterations,
+                               lambda i: agent.get_upskilling_suggestions(searches[i][0], opportunities.get(i, []))))
+        results.append(measure('get_ai_recommendations', corpus_size, args.iterations,
+                               lambda i: agent.get_ai_recommendations(searches[i][0], opportunities.get(i, []))))
+
+        for result in results:
+            result['upstream_requests'] = {name: service.requests for name, service in services.items()}
+
+        agent.close()
+        return results
+
+    finally:
+        for service in services.values():
+            service.stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def check_provider_resilience(reset_timeout=0.2):
+    # Drives one provider's circuit breaker through closed -> open ->
+    # half-open -> closed against a mock that fails every request, including
+    # a half-open trial that dies with a non-HTTP exception. Returns a list of
+    # failed checks.
+    service = MockService(adzuna_handler(generate_jobs(10)), error_rate=1.0).start()
+    resilience = ProviderResilience(max_attempts=1, breaker_threshold=3, breaker_reset=reset_timeout)
+    breaker = resilience.breaker('Adzuna')
+    url = service.url + '/v1/api/jobs/in/search/1'
+    failures = []
+
+    def check(name, condition):
+        print(f"  {'ok  ' if condition else 'FAIL'} {name}")
+        if not condition:
+            failures.append(name)
+
+    def call(request=lambda: requests.get(url, params={'where': 'Pune'}, timeout=5)):
+        try:
+            return resilience.call('Adzuna', request)
+        except ProviderUnavailable:
+            return None
+
+    def broken_request():
+        raise ValueError("malformed response")
+
+    try:
+        for _ in range(3):
+            call()
+        check("opens after 3 failed calls", breaker.state == 'open')
+        sent = service.requests
+        check("open breaker skips the provider", call() is None and service.requests == sent)
+
+        time.sleep(reset_timeout * 1.5)
+        check("half-open after the reset timeout", breaker.state == 'half_open')
+        try:
+            call(broken_request)
+        except ValueError:
+            pass
+        check("unexpected error in the trial reopens the breaker",
+              breaker.state == 'open' and not breaker.trial_running)
+
+        time.sleep(reset_timeout * 1.5)
+        service.error_rate = 0.0
+        response = call()
+        check("successful trial closes the breaker",
+              response is not None and response.status_code == 200 and breaker.state == 'closed')
+    finally:
+        resilience.close()
+        service.stop()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ascend against local mock providers.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="synthetic corpus sizes")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--description-words', type=int, default=120)
+    parser.add_argument('--adzuna-latency-ms', type=float, default=1200)
+    parser.add_argument('--jsearch-latency-ms', type=float, default=1800)
+    parser.add_argument('--gemini-latency-ms', type=float, default=600, help="time to first token")
+    parser.add_argument('--gemini-stream-interval-ms', type=float, default=200)
+    parser.add_argument('--gemini-rpm', type=int, default=10000)
+    parser.add_argument('--jitter-ms', type=float, default=200)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of provider requests answered with 503")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="share of provider requests delayed by --slow-ms")
+    parser.add_argument('--slow-ms', type=float, default=5000)
+    parser.add_argument('--cache', action='store_true', help="keep the provider response cache enabled")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--check-resilience', action='store_true',
+                        help="check the provider circuit breaker against a failing mock and exit")
+    args = parser.parse_args()
+
+    if args.check_resilience:
+        print("Checking provider circuit breaker...")
+        raise SystemExit(1 if check_provider_resilience() else 0)
+
+    try:
+        import google.generativeai
+        gemini_sdk = True
+    except ImportError:
+        gemini_sdk = False
+        print("google-generativeai is not installed; get_ai_recommendations will measure the fallback path.")
+
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking corpus of {size} postings...")
+        for result in run_scale(size, args):
+            results.append(result)
+            print(f"  {result['operation']:<28} p50 {result['p50_ms']:9.1f} ms   p95 {result['p95_ms']:9.1f} ms   "
+                  f"p99 {result['p99_ms']:9.1f} ms   {result['throughput_per_s']:8.2f}/s")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'gemini_sdk': gemini_sdk,
+        'config': vars(args),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()